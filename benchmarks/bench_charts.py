@@ -0,0 +1,107 @@
+"""
+Chart encoding: the old repeated-savefig DPI search vs utils.charts
+(one rasterization, then quantize/downscale the buffer if needed).
+
+Reports matplotlib render count, latency and PNG size per figure.
+
+Run from the project root:
+    python -m benchmarks.bench_charts --points 200000 --repeat 3
+"""
+import argparse
+import base64
+import time
+from io import BytesIO
+
+import numpy as np
+
+from utils.charts import plot_to_png
+import matplotlib.pyplot as plt
+
+def legacy_plot_to_base64(fig, max_kb: int = 100) -> str:
+    """The per-handler helper this benchmark replaces (kept for comparison)."""
+    try:
+        for dpi in (150, 120, 100, 90, 80, 70, 60):
+            buf = BytesIO()
+            fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight", pad_inches=0.1)
+            data = buf.getvalue()
+            if len(data) <= max_kb * 1024:
+                return base64.b64encode(data).decode("utf-8")
+        return base64.b64encode(data).decode("utf-8")
+    finally:
+        plt.close(fig)
+
+def shared_plot_to_base64(fig, max_kb: int = 100) -> str:
+    """utils.charts.plot_to_png plus the same base64 step as the legacy helper."""
+    return base64.b64encode(plot_to_png(fig, max_kb)).decode("utf-8")
+
+def _line_figure(points, rng):
+    fig, ax = plt.subplots()
+    ax.plot(np.arange(points), np.cumsum(rng.normal(size=points)), color="red")
+    ax.set_title("Noisy line")
+    return fig
+
+def _dense_line_figure(points, rng):
+    fig, ax = plt.subplots()
+    ax.plot(np.arange(points), rng.normal(size=points), color="red", linewidth=0.5)
+    ax.set_title("Dense line")
+    return fig
+
+def _hist_figure(points, rng):
+    fig, ax = plt.subplots()
+    ax.hist(rng.exponential(size=points), bins=10, color="orange", edgecolor="black")
+    ax.set_title("Histogram")
+    return fig
+
+def _scatter_figure(points, rng):
+    fig, ax = plt.subplots()
+    ax.scatter(rng.random(points // 10), rng.random(points // 10), s=4, c=rng.random(points // 10))
+    ax.set_title("Scatter")
+    return fig
+
+FIGURES = {"line": _line_figure, "dense_line": _dense_line_figure, "histogram": _hist_figure, "scatter": _scatter_figure}
+
+def _measure(encode, make_figure, points, repeat, seed):
+    renders = 0
+    elapsed = 0.0
+    size = 0
+    for i in range(repeat):
+        fig = make_figure(points, np.random.default_rng(seed + i))
+        original_savefig = fig.savefig
+
+        def counting_savefig(*args, **kwargs):
+            nonlocal renders
+            renders += 1
+            return original_savefig(*args, **kwargs)
+
+        fig.savefig = counting_savefig
+        start = time.perf_counter()
+        encoded = encode(fig)
+        elapsed += time.perf_counter() - start
+        size = len(base64.b64decode(encoded))
+    return {
+        "renders": renders / repeat,
+        "ms": round(elapsed / repeat * 1000, 1),
+        "png_kb": round(size / 1024, 1),
+    }
+
+def run(points, repeat, seed=0):
+    results = {}
+    for name, make_figure in FIGURES.items():
+        results[name] = {
+            "legacy": _measure(legacy_plot_to_base64, make_figure, points, repeat, seed),
+            "shared": _measure(shared_plot_to_base64, make_figure, points, repeat, seed),
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--points", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    for name, result in run(args.points, args.repeat).items():
+        legacy, shared = result["legacy"], result["shared"]
+        print(f"{name:>10}: legacy {legacy['renders']:.1f} renders {legacy['ms']:>8} ms {legacy['png_kb']:>6} KB"
+              f" | shared {shared['renders']:.1f} renders {shared['ms']:>8} ms {shared['png_kb']:>6} KB")
+
+if __name__ == "__main__":
+    main()
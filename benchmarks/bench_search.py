@@ -0,0 +1,90 @@
+"""
+Per-query latency of BM25 full-text search: prebuilt inverted index vs a
+linear scan that tokenizes and scores every summary per query.
+
+Run from the project root:
+    python -m benchmarks.bench_search --articles 20000 --queries 50
+"""
+import argparse
+import random
+import time
+
+from utils.wikipedia_search import (
+    BM25_B, BM25_K1, TextSearchIndex, TitleSearchIndex, tokenize,
+)
+
+def synthetic_articles(count, vocab_size=5000, seed=42):
+    """Articles with Zipf-ish word frequencies so postings sizes look realistic."""
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(vocab_size)]
+    weights = [1 / (rank + 1) for rank in range(vocab_size)]
+    articles = []
+    for i in range(count):
+        words = rng.choices(vocab, weights=weights, k=rng.randint(40, 80))
+        articles.append({
+            "title": f"Article {i}",
+            "summary": " ".join(words),
+            "categories": [f"Category {rng.randint(0, 200)}"],
+            "links": [],
+            "images": [],
+        })
+    return articles, vocab
+
+def linear_scan(articles, index, query, limit):
+    """Baseline: re-tokenize every summary and score it against the query."""
+    terms = set(tokenize(query))
+    avg_length = index.avg_summary_length or 1.0
+    scores = []
+    for entry_id, article in enumerate(articles):
+        tokens = tokenize(article["summary"])
+        score = 0.0
+        for term in terms:
+            tf = tokens.count(term)
+            if tf and term in index.idf_summary:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / avg_length)
+                score += index.idf_summary[term] * tf * (BM25_K1 + 1) / (tf + norm)
+        if score:
+            scores.append((score, entry_id))
+    scores.sort(reverse=True)
+    return scores[:limit]
+
+def _time_queries(func, queries):
+    start = time.perf_counter()
+    for query in queries:
+        func(query)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+def run(article_count, query_count, limit=10, seed=42):
+    articles, vocab = synthetic_articles(article_count, seed=seed)
+    rng = random.Random(seed + 1)
+    # Mix of common and rare terms, 1-3 words per query
+    queries = [" ".join(rng.choices(vocab[:2000], k=rng.randint(1, 3))) for _ in range(query_count)]
+
+    start = time.perf_counter()
+    TitleSearchIndex(articles)
+    index = TextSearchIndex(articles)
+    build_s = time.perf_counter() - start
+
+    indexed_ms = _time_queries(lambda q: index.search(q, limit), queries)
+    scan_ms = _time_queries(lambda q: linear_scan(articles, index, q, limit), queries)
+    return {
+        "articles": article_count,
+        "queries": query_count,
+        "index_build_s": round(build_s, 3),
+        "indexed_ms_per_query": round(indexed_ms, 3),
+        "linear_scan_ms_per_query": round(scan_ms, 3),
+        "speedup": round(scan_ms / indexed_ms, 1) if indexed_ms else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+    result = run(args.articles, args.queries, args.limit)
+    for key, value in result.items():
+        print(f"{key:>26}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Cold start: time from launching the server until GET / answers 200.
+
+Each run starts a fresh `uvicorn main:app` process (as the Procfile does)
+and polls the health check. "lazy" is the app as shipped; "eager" imports
+the CSV handlers (pandas, matplotlib, networkx) before the app, as main.py
+used to. Also reports the bare `import main` time for each.
+
+Run from the project root:
+    python -m benchmarks.bench_startup --repeat 5
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+PRELOAD = {
+    "lazy": "",
+    "eager": "from utils.analysis_pool import import_handlers; import_handlers(); ",
+}
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _env() -> dict:
+    # Keep background warm-up and pool workers out of the measurement
+    return dict(os.environ, ANALYSIS_PREWARM="0", WIKIPEDIA_RELOAD_INTERVAL="0")
+
+def time_import(variant: str) -> float:
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"{PRELOAD[variant]}import main; print(time.perf_counter() - start)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], env=_env(), capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+def time_ready(variant: str, timeout: float = 60.0) -> float:
+    port = _free_port()
+    code = (
+        f"{PRELOAD[variant]}import uvicorn; "
+        f"uvicorn.run('main:app', host='127.0.0.1', port={port}, log_level='warning')"
+    )
+    url = f"http://127.0.0.1:{port}/"
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-c", code], env=_env(),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"server exited with code {proc.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"server not ready after {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+def run(repeat):
+    results = {}
+    for variant in PRELOAD:
+        imports = [time_import(variant) for _ in range(repeat)]
+        ready = [time_ready(variant) for _ in range(repeat)]
+        results[variant] = {
+            "import_s": round(statistics.median(imports), 3),
+            "ready_s": round(statistics.median(ready), 3),
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for variant, result in run(args.repeat).items():
+        print(f"{variant:>6}: import main {result['import_s']:>6} s | first 200 from / {result['ready_s']:>6} s")
+
+if __name__ == "__main__":
+    main()
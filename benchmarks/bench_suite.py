@@ -0,0 +1,249 @@
+"""
+Benchmark suite: Wikipedia lookups and handlers plus every CSV analyzer on
+synthetic inputs (see benchmarks.generators), saved as JSON for comparing
+runs.
+
+Scales (articles / CSV rows):
+    small   10k / 100k     (default)
+    medium  1M / 1M
+    large   5M / 5M
+Inputs are generated once per (size, seed) and cached in benchmarks/.data.
+
+Run from the project root:
+    python -m benchmarks.bench_suite --scale small --output before.json
+    python -m benchmarks.bench_suite --scale small --compare before.json
+--compare prints the change per benchmark and exits with status 1 when any
+median is more than --threshold (default 20%) slower than the baseline.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks import generators
+
+SCALES = {
+    "small": {"articles": 10_000, "rows": 100_000},
+    "medium": {"articles": 1_000_000, "rows": 1_000_000},
+    "large": {"articles": 5_000_000, "rows": 5_000_000},
+}
+GROUPS = ("wikipedia", "analyze")
+
+def measure(func, repeat: int, number: int = 1) -> dict:
+    """Median/min/max over repeat runs of number calls, in ms per call."""
+    samples = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number * 1000)
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "min_ms": round(min(samples), 4),
+        "max_ms": round(max(samples), 4),
+        "calls": number,
+        "repeat": repeat,
+    }
+
+def _cycle(items):
+    """Callable returning the next item on each call (round robin)."""
+    state = {"i": 0}
+
+    def next_item():
+        item = items[state["i"] % len(items)]
+        state["i"] += 1
+        return item
+    return next_item
+
+def bench_wikipedia(articles: int, repeat: int, seed: int) -> dict:
+    from utils import wikipedia_loader
+    from handlers import related, search, stats, top_categories
+
+    path = generators.ensure("wikipedia", articles, seed)
+    # Point the loader at the synthetic file; no snapshot or reload thread
+    wikipedia_loader.DATA_PATH = path
+    wikipedia_loader.SNAPSHOT_ENABLED = False
+    wikipedia_loader.RELOAD_INTERVAL = 0
+    wikipedia_loader.clear_cache()
+
+    results = {}
+    start = time.perf_counter()
+    wikipedia_loader.get_dataset()
+    results["wikipedia.load"] = {"median_ms": round((time.perf_counter() - start) * 1000, 4), "calls": 1, "repeat": 1}
+
+    rng = random.Random(seed)
+    vocab = generators.vocabulary(seed=seed)
+    ids = [rng.randrange(articles) for _ in range(1000)]
+    hits = [generators.article_title(i, vocab) for i in ids]
+    # Case/whitespace variants exercise normalization; misses the negative path
+    variants = [f"  {t.upper()} " for t in hits[:200]]
+    misses = [f"No such article {i}" for i in range(200)]
+    lookups = hits + variants + misses
+    rng.shuffle(lookups)
+    next_title = _cycle(lookups)
+    results["wikipedia.find_article"] = measure(
+        lambda: wikipedia_loader.find_article(next_title()), repeat, len(lookups)
+    )
+
+    # Pieces of real titles for substring/prefix search, 1-2 common words for BM25
+    fragments = []
+    for _ in range(500):
+        word = rng.choice(rng.choice(hits).split()[:2]).lower()
+        start = rng.randrange(len(word) - 2)
+        fragments.append(word[start:start + rng.randint(3, 6)])
+    words = vocab[:2000]
+    phrases = [" ".join(rng.sample(words, rng.randint(1, 2))) for _ in range(500)]
+    for mode, queries in (("substring", fragments), ("prefix", fragments), ("fulltext", phrases)):
+        next_query = _cycle(queries)
+        results[f"search.{mode}"] = measure(
+            lambda: search.handler({"params": {"q": next_query(), "mode": mode, "limit": "20"}}),
+            repeat, len(queries),
+        )
+
+    results["stats"] = measure(lambda: stats.handler({"params": {}}), repeat, 1000)
+    results["top_categories"] = measure(
+        lambda: top_categories.handler({"params": {"limit": "10"}}), repeat, 1000
+    )
+
+    sources = hits[:200]
+    next_source = _cycle(sources)
+    for name, params in (
+        ("related.depth1", {}),
+        ("related.backlinks", {"backlinks": "true"}),
+        ("related.depth2", {"depth": "2"}),
+    ):
+        results[name] = measure(
+            lambda: related.handler({"params": dict(params, title=next_source())}),
+            repeat, len(sources),
+        )
+    wikipedia_loader.clear_cache()
+    return results
+
+def _analyze_streaming(handler, kind: str, csv_path: str) -> dict:
+    """handler.analyze_<kind> with streaming forced on: compute, render and assemble."""
+    from utils.charts import assemble_result
+
+    metrics, chart_data = getattr(handler, f"compute_{kind}")(csv_path, streaming=True)
+    charts = getattr(handler, f"render_{kind}_charts")(chart_data)
+    return assemble_result(handler.RESULT_KEYS, metrics, charts)
+
+def bench_analyze(rows: int, repeat: int, seed: int) -> dict:
+    from handlers import sales as sales_handler, weather as weather_handler
+    from handlers.network import analyze_network
+    from utils.metrics import collect_stages
+
+    sales = generators.ensure("sales", rows, seed)
+    weather = generators.ensure("weather", rows, seed)
+    edges = generators.ensure("edges", rows, seed)
+    # A few node pairs for the shortest-path report
+    pairs = [(f"n{i}", f"n{i * 37 + 11}") for i in range(10)]
+
+    cases = {
+        "analyze_sales": lambda: sales_handler.analyze_sales(sales),
+        # Same work as analyze_*, so the streaming medians compare directly
+        "analyze_sales.streaming": lambda: _analyze_streaming(sales_handler, "sales", sales),
+        "analyze_weather": lambda: weather_handler.analyze_weather(weather),
+        "analyze_weather.streaming": lambda: _analyze_streaming(weather_handler, "weather", weather),
+        "analyze_network": lambda: analyze_network(edges),
+        "analyze_network.pairs": lambda: analyze_network(edges, pairs),
+    }
+    results = {}
+    for name, func in cases.items():
+        # Per-stage times (parse/compute/render/encode) of the last run
+        def run():
+            with collect_stages() as stages:
+                func()
+            run.stages = stages
+        result = measure(run, repeat)
+        result["stages_ms"] = {stage: round(s * 1000, 2) for stage, s in run.stages.items()}
+        results[name] = result
+    return results
+
+def _git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(scale: str, groups=GROUPS, repeat: int = 5, seed: int = 42, articles=None, rows=None) -> dict:
+    sizes = dict(SCALES[scale])
+    if articles:
+        sizes["articles"] = articles
+    if rows:
+        sizes["rows"] = rows
+    results = {}
+    if "wikipedia" in groups:
+        results.update(bench_wikipedia(sizes["articles"], repeat, seed))
+    if "analyze" in groups:
+        # Chart-heavy cases run fewer times
+        results.update(bench_analyze(sizes["rows"], max(1, repeat // 2), seed))
+    return {
+        "meta": {
+            "scale": scale,
+            "sizes": sizes,
+            "seed": seed,
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+def compare(report: dict, baseline: dict, threshold: float) -> list:
+    """Print per-benchmark change vs baseline; return names slower than threshold."""
+    regressions = []
+    if report["meta"]["sizes"] != baseline["meta"].get("sizes"):
+        print(f"warning: sizes differ from baseline ({baseline['meta'].get('sizes')})")
+    for name, result in report["results"].items():
+        before = baseline["results"].get(name)
+        if not before or not before.get("median_ms"):
+            print(f"{name:>28}: {result['median_ms']:>12.4f} ms  (new)")
+            continue
+        change = result["median_ms"] / before["median_ms"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:>28}: {result['median_ms']:>12.4f} ms  {change:+7.1%} vs {before['median_ms']:.4f}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--articles", type=int, help="override the scale's article count")
+    parser.add_argument("--rows", type=int, help="override the scale's CSV row count")
+    parser.add_argument("--only", choices=GROUPS, action="append", help="run only this group (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.20)
+    args = parser.parse_args()
+
+    report = run(args.scale, args.only or GROUPS, args.repeat, args.seed, args.articles, args.rows)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+    else:
+        for name, result in report["results"].items():
+            print(f"{name:>28}: {result['median_ms']:>12.4f} ms/call")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Deterministic synthetic inputs for the benchmarks.
+
+Every generator streams rows to disk, so multi-million-row files never sit
+in memory, and depends only on (size, seed): the same arguments always
+produce byte-identical files.
+
+- Wikipedia datasets (.jsonl, or a JSON array for .json paths): pseudo-word
+  titles, Zipf-distributed summary words, categories drawn from a Zipf-ish
+  pool, links to other articles (some dangling) and a few redirects.
+- Sales, weather and edge-list CSVs in the formats the analyzers expect.
+
+Files are cached under DATA_DIR by ensure(), keyed by kind, size and seed.
+
+Run from the project root, e.g.:
+    python -m benchmarks.generators wikipedia 1000000
+    python -m benchmarks.generators sales 5000000 --output /tmp/sales.csv
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import random
+from datetime import datetime, timedelta
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), ".data")
+
+_SYLLABLES = [
+    c + v for c in "bcdfghklmnprstvz" for v in ("a", "e", "i", "o", "u", "ar", "en", "on")
+]
+
+def vocabulary(size: int = 20000, seed: int = 42) -> list:
+    """Distinct pronounceable pseudo-words (so title n-grams look like real text)."""
+    rng = random.Random(seed)
+    words, seen = [], set()
+    while len(words) < size:
+        word = "".join(rng.choices(_SYLLABLES, k=rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+def _cumulative(weights):
+    total = 0.0
+    for w in weights:
+        total += w
+        yield total
+
+def _zipf_weights(n: int, s: float = 1.0) -> list:
+    return [1 / (rank + 1) ** s for rank in range(n)]
+
+def article_title(i: int, vocab: list) -> str:
+    """Title of article i; unique because the id is folded in."""
+    first = vocab[(i * 7919) % len(vocab)]
+    second = vocab[(i * 104729 + 13) % len(vocab)]
+    return f"{first.capitalize()} {second} {i}"
+
+def iter_articles(count: int, seed: int = 42):
+    """Yield count article dicts (see module docstring)."""
+    rng = random.Random(seed)
+    vocab = vocabulary(seed=seed)
+    # Cumulative weights make rng.choices O(log n) per draw
+    word_cum = list(_cumulative(_zipf_weights(len(vocab))))
+    categories = [f"{vocab[i].capitalize()} topics" for i in range(min(5000, len(vocab)))]
+    category_cum = list(_cumulative(_zipf_weights(len(categories), 0.8)))
+    for i in range(count):
+        summary = rng.choices(vocab, cum_weights=word_cum, k=rng.randint(20, 60))
+        article = {
+            "title": article_title(i, vocab),
+            "summary": " ".join(summary).capitalize() + ".",
+            "categories": sorted(set(rng.choices(categories, cum_weights=category_cum, k=rng.randint(1, 4)))),
+            # Mostly existing articles; ids past count are dangling links
+            "links": [article_title(rng.randrange(int(count * 1.05) + 1), vocab) for _ in range(rng.randint(3, 20))],
+            "images": [f"https://upload.example.org/{i}/{k}.png" for k in range(rng.randint(0, 3))],
+        }
+        if rng.random() < 0.05:
+            article["redirects"] = [f"{summary[0].capitalize()} ({i})"]
+        yield article
+
+def write_wikipedia(path: str, count: int, seed: int = 42) -> str:
+    """Write count articles as JSON lines (.jsonl/.ndjson) or as one JSON array."""
+    ndjson = path.lower().endswith((".jsonl", ".ndjson"))
+    with open(path, "w", encoding="utf-8") as f:
+        if not ndjson:
+            f.write("[\n")
+        for i, article in enumerate(iter_articles(count, seed)):
+            if not ndjson and i:
+                f.write(",\n")
+            f.write(json.dumps(article, ensure_ascii=False))
+            if ndjson:
+                f.write("\n")
+        if not ndjson:
+            f.write("\n]\n")
+    return path
+
+def write_sales_csv(path: str, rows: int, seed: int = 42, days: int = 3 * 365) -> str:
+    """date,region,sales with dates in ascending order over `days` days."""
+    rng = random.Random(seed)
+    regions = ["North", "South", "East", "West", "Central", "Northeast", "Southwest", "Pacific"]
+    region_cum = list(_cumulative([8, 7, 6, 5, 4, 3, 2, 1]))
+    start = datetime(2022, 1, 1)
+    dates = [(start + timedelta(days=d)).strftime("%Y-%m-%d") for d in range(days)]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["date", "region", "sales"])
+        for i in range(rows):
+            writer.writerow([
+                dates[i * days // rows],
+                rng.choices(regions, cum_weights=region_cum)[0],
+                round(rng.lognormvariate(5, 0.8), 2),
+            ])
+    return path
+
+def write_weather_csv(path: str, rows: int, seed: int = 42) -> str:
+    """date,temp_c,precip_mm: hourly readings with a seasonal + daily cycle."""
+    rng = random.Random(seed)
+    start = datetime(2000, 1, 1)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["date", "temp_c", "precip_mm"])
+        for i in range(rows):
+            season = math.sin(2 * math.pi * i / (24 * 365.25))
+            day = math.sin(2 * math.pi * (i % 24) / 24)
+            temp = 12 + 10 * season + 4 * day + rng.gauss(0, 2)
+            precip = round(rng.expovariate(0.5), 1) if rng.random() < 0.15 else 0.0
+            writer.writerow([(start + timedelta(hours=i)).strftime("%Y-%m-%d %H:%M"), round(temp, 1), precip])
+    return path
+
+def write_edges_csv(path: str, rows: int, seed: int = 42, nodes: int = 0) -> str:
+    """source,target edge list over `nodes` nodes (default rows // 4) with hub-heavy degrees."""
+    rng = random.Random(seed)
+    nodes = nodes or max(2, rows // 4)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["source", "target"])
+        for _ in range(rows):
+            # paretovariate skews sources towards low ids, giving a few hubs
+            source = min(nodes - 1, int(rng.paretovariate(1.2)) - 1)
+            target = rng.randrange(nodes)
+            if target == source:
+                target = (target + 1) % nodes
+            writer.writerow([f"n{source}", f"n{target}"])
+    return path
+
+GENERATORS = {
+    "wikipedia": (write_wikipedia, ".jsonl"),
+    "sales": (write_sales_csv, ".csv"),
+    "weather": (write_weather_csv, ".csv"),
+    "edges": (write_edges_csv, ".csv"),
+}
+
+def ensure(kind: str, size: int, seed: int = 42, data_dir: str = DATA_DIR) -> str:
+    """Path of a cached synthetic file, generating it on first use."""
+    write, extension = GENERATORS[kind]
+    name = f"{kind}-{size}-s{seed}"
+    path = os.path.join(data_dir, name + extension)
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        # Written under a temporary name (same extension, which selects the format)
+        partial = os.path.join(data_dir, name + ".partial" + extension)
+        write(partial, size, seed)
+        os.replace(partial, path)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("kind", choices=sorted(GENERATORS))
+    parser.add_argument("size", type=int, help="articles or CSV rows")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help=f"file to write (default: cached under {DATA_DIR})")
+    args = parser.parse_args()
+    if args.output:
+        path = GENERATORS[args.kind][0](args.output, args.size, args.seed)
+    else:
+        path = ensure(args.kind, args.size, args.seed)
+    print(path)
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,63 @@
 import os
 
-# Build the path to the dataset
-DATA_PATH = os.path.join(os.path.dirname(__file__), "data", "wikipedia.json")
+# Build the path to the dataset (override with WIKIPEDIA_DATA_PATH, e.g. to a
+# newline-delimited .jsonl/.ndjson export)
+DATA_PATH = os.environ.get(
+    "WIKIPEDIA_DATA_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "wikipedia.json"),
+)
+
+# Worker processes used to parse newline-delimited datasets (1 = in-process)
+DATA_LOAD_WORKERS = int(os.environ.get("WIKIPEDIA_LOAD_WORKERS", "1"))
+
+# Binary snapshot of the parsed dataset + indexes, reused across restarts
+# while the source file is unchanged (WIKIPEDIA_SNAPSHOT=0 disables it).
+# Snapshots are pickles signed with SNAPSHOT_KEY (HMAC-SHA256) and only
+# read or written when a key is set
+SNAPSHOT_KEY = os.environ.get("WIKIPEDIA_SNAPSHOT_KEY", "").encode("utf-8")
+SNAPSHOT_ENABLED = os.environ.get("WIKIPEDIA_SNAPSHOT", "1") != "0" and bool(SNAPSHOT_KEY)
+SNAPSHOT_PATH = os.environ.get("WIKIPEDIA_SNAPSHOT_PATH", DATA_PATH + ".snapshot")
+
+# Seconds between checks of the dataset file for changes (0 disables hot reload)
+RELOAD_INTERVAL = float(os.environ.get("WIKIPEDIA_RELOAD_INTERVAL", "30"))
+
+# CSV analysis runs on a pool of pre-warmed worker processes (0 = run in a
+# thread in the web process) with a per-job timeout in seconds
+ANALYSIS_POOL_SIZE = int(os.environ.get("ANALYSIS_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+ANALYSIS_TIMEOUT = float(os.environ.get("ANALYSIS_TIMEOUT", "120"))
+# Handlers (pandas, matplotlib, networkx) are imported lazily; with prewarm on
+# the pool is started (or, without a pool, the handlers imported) in the
+# background right after startup instead of on the first upload
+ANALYSIS_PREWARM = os.environ.get("ANALYSIS_PREWARM", "1") != "0"
+
+# Cache of /analyze responses keyed by handler + upload hash: in-memory LRU
+# budget in bytes (0 disables) and an optional on-disk tier with its own budget
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR", "")
+RESULT_CACHE_DISK_MAX_BYTES = int(os.environ.get("RESULT_CACHE_DISK_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+# Sales uploads at least this many bytes are aggregated chunk by chunk with
+# bounded memory instead of loaded whole (0 = always stream)
+SALES_STREAM_BYTES = int(os.environ.get("SALES_STREAM_BYTES", str(256 * 1024 * 1024)))
+# Same for weather uploads (online moments, running argmax, fixed-bin histogram)
+WEATHER_STREAM_BYTES = int(os.environ.get("WEATHER_STREAM_BYTES", str(256 * 1024 * 1024)))
+
+# Log level of the web process; request timing lines are logged at INFO and
+# per-result debug dumps are skipped entirely unless this is DEBUG
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+
+# GET routes for the Wikipedia handlers: Cache-Control max-age in seconds
+# (0 = clients revalidate every time with If-None-Match) and the byte budget
+# of the server-side LRU of encoded responses (0 disables it)
+WIKIPEDIA_CACHE_MAX_AGE = int(os.environ.get("WIKIPEDIA_CACHE_MAX_AGE", "0"))
+WIKIPEDIA_RESPONSE_CACHE_BYTES = int(os.environ.get("WIKIPEDIA_RESPONSE_CACHE_BYTES", str(16 * 1024 * 1024)))
+
+# Seconds a deferred chart job (POST / with mode=job) is kept after creation
+JOB_TTL = float(os.environ.get("ANALYSIS_JOB_TTL", "600"))
 
 # Optional: safety check so missing dataset is obvious
 if not os.path.exists(DATA_PATH):
     raise FileNotFoundError(
-        f"❌ wikipedia.json not found at: {DATA_PATH}\n"
+        f"❌ Dataset not found at: {DATA_PATH}\n"
         f"Make sure 'data/wikipedia.json' exists in the project folder."
     )
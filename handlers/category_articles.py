@@ -0,0 +1,70 @@
+from utils.wikipedia_index import intersect_sorted, normalize_title, union_sorted
+from utils.wikipedia_loader import get_dataset
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+def _int_param(params: dict, name: str, default: int):
+    """Parse an integer query param; invalid values fall back to default."""
+    value = params.get(name, "")
+    value = value.strip() if isinstance(value, str) else ""
+    try:
+        return int(value) if value else default
+    except ValueError:
+        return default
+
+def handler(request: dict) -> dict:
+    """
+    Lists the articles in one or more categories.
+    Query params: categories=<cat1>|<cat2>|... (case-insensitive),
+    op=and (articles in every category, default) or op=or (in any),
+    limit=<n> (default 20, max 100), offset=<n>.
+    """
+    params = request["params"]
+
+    # 1️⃣ Parse the category list and options
+    categories_param = params.get("categories", "")
+    if not isinstance(categories_param, str) or not categories_param.strip():
+        return {"error": "Missing 'categories' query parameter"}
+    categories = [c.strip() for c in categories_param.split("|") if c.strip()]
+    if not categories:
+        return {"error": "Missing 'categories' query parameter"}
+
+    op = params.get("op", "")
+    op = op.strip().lower() if isinstance(op, str) else ""
+    if op not in ("", "and", "or"):
+        return {"error": "Op must be 'and' or 'or'"}
+    op = op or "and"
+
+    limit = _int_param(params, "limit", DEFAULT_LIMIT)
+    if limit <= 0:
+        return {"error": "Limit must be a positive integer"}
+    limit = min(limit, MAX_LIMIT)
+    offset = _int_param(params, "offset", 0)
+    if offset < 0:
+        return {"error": "Offset must be a non-negative integer"}
+
+    # 2️⃣ Merge the sorted postings lists built when the dataset loaded
+    dataset = get_dataset()
+    postings = dataset.indexes["categories"]
+    lists = [postings.get(normalize_title(c), []) for c in categories]
+    if op == "and":
+        article_ids = intersect_sorted(lists)
+    else:
+        article_ids = union_sorted(lists)
+
+    # 3️⃣ Return the requested page
+    data = dataset.articles
+    previews = dataset.indexes["previews"]
+    results = [
+        {"title": data[i].get("title", ""), "summary": previews[i]}
+        for i in article_ids[offset:offset + limit]
+    ]
+    return {
+        "categories": categories,
+        "op": op,
+        "count": len(article_ids),
+        "limit": limit,
+        "offset": offset,
+        "results": results
+    }
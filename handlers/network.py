@@ -1,33 +1,46 @@
+import numpy as np
 import pandas as pd
 import networkx as nx
-import matplotlib
-matplotlib.use("Agg")
+from scipy import sparse
+from utils.charts import assemble_result, plot_to_png
+from utils.metrics import timed
+from utils.graph_paths import nx_single_source, shortest_path_report, sparse_single_source
 import matplotlib.pyplot as plt
-import base64
-from io import BytesIO
 
-def _plot_to_base64(fig, max_kb: int = 100) -> str:
-    """Convert matplotlib figure to base64 PNG string under max_kb."""
-    try:
-        for dpi in (150, 120, 100, 90, 80, 70, 60):
-            buf = BytesIO()
-            fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight", pad_inches=0.1)
-            data = buf.getvalue()
-            if len(data) <= max_kb * 1024:
-                return base64.b64encode(data).decode("utf-8")
-        # If no dpi produces small enough image, return the last one anyway
-        return base64.b64encode(data).decode("utf-8")
-    finally:
-        plt.close(fig)
+# Response keys in order; charts are filled in by render_network_charts
+RESULT_KEYS = (
+    "edge_count", "highest_degree_node", "average_degree", "density",
+    "shortest_path_alice_eve", "shortest_paths", "path_stats",
+    "network_graph", "degree_histogram",
+)
 
-def analyze_network(csv_path: str) -> dict:
-    # Read CSV with edges
-    df = pd.read_csv(csv_path)
-    
-    # Create undirected graph from edges
-    G = nx.Graph()
-    for _, row in df.iterrows():
-        G.add_edge(row["source"], row["target"])
+# Always reported as shortest_path_alice_eve, on top of any requested pairs
+DEFAULT_PAIR = ("Alice", "Eve")
+
+# Above this many nodes metrics come from a sparse adjacency matrix and the
+# charts show a sample instead of the whole graph
+LARGE_GRAPH_NODES = 2000
+# Large mode: draw the induced subgraph of the highest-degree nodes only
+DRAW_MAX_NODES = 300
+DEGREE_HISTOGRAM_BINS = 50
+
+def _metrics(edge_count, highest_degree_node, average_degree, density, pairs, single_source) -> dict:
+    # One BFS per distinct source covers the default pair and every requested one
+    paths, stats = shortest_path_report([DEFAULT_PAIR] + pairs, single_source)
+    shortest_path_alice_eve = paths[0]["length"]
+    return {
+        "edge_count": int(edge_count),
+        "highest_degree_node": str(highest_degree_node) if highest_degree_node is not None else "",
+        "average_degree": round(float(average_degree), 2),
+        "density": round(float(density), 2),
+        "shortest_path_alice_eve": int(shortest_path_alice_eve) if shortest_path_alice_eve is not None else None,
+        "shortest_paths": paths[1:],
+        "path_stats": {source: stats[source] for source, _ in pairs},
+    }
+
+def _compute_small(df: pd.DataFrame, pairs: list) -> tuple[dict, dict]:
+    # Create undirected graph from edges (bulk edge list, same node order as row-by-row)
+    G = nx.from_pandas_edgelist(df, source="source", target="target")
     
     edge_count = G.number_of_edges()
     degree_dict = dict(G.degree())
@@ -42,34 +55,104 @@ def analyze_network(csv_path: str) -> dict:
     
     density = nx.density(G) if edge_count > 0 else 0.0
     
-    # Try getting shortest path between Alice and Eve, else None
-    try:
-        shortest_path_alice_eve = nx.shortest_path_length(G, source="Alice", target="Eve")
-    except (nx.NetworkXNoPath, nx.NodeNotFound):
-        shortest_path_alice_eve = None
-    
-    # Draw network graph
+    metrics = _metrics(edge_count, highest_degree_node, average_degree, density, pairs, nx_single_source(G))
+    chart_data = {"large": False, "graph": G, "degrees": list(degree_dict.values())}
+    return metrics, chart_data
+
+def _compute_large(codes: np.ndarray, labels: np.ndarray, pairs: list) -> tuple[dict, dict]:
+    """Metrics from a deduplicated sparse adjacency matrix; charts from a sample."""
+    n = len(labels)
+    u, v = codes[0::2], codes[1::2]
+    # Undirected: normalise each edge to (low, high) and drop duplicates
+    low, high = np.minimum(u, v), np.maximum(u, v)
+    edge_keys = np.unique(low.astype(np.int64) * n + high)
+    low, high = edge_keys // n, edge_keys % n
+
+    edge_count = len(edge_keys)
+    # A self-loop adds 2 to its node's degree, as in networkx
+    degrees = np.bincount(low, minlength=n) + np.bincount(high, minlength=n)
+    top = int(np.argmax(degrees))
+    average_degree = degrees.sum() / n
+    density = 2 * edge_count / (n * (n - 1)) if n > 1 else 0.0
+
+    adjacency = sparse.coo_matrix(
+        (np.ones(edge_count, dtype=np.int8), (low, high)), shape=(n, n)
+    ).tocsr()
+    metrics = _metrics(
+        edge_count, labels[top], average_degree, density, pairs, sparse_single_source(adjacency, labels)
+    )
+
+    # Sample for drawing: induced subgraph of the highest-degree nodes
+    keep = np.argsort(-degrees, kind="stable")[:DRAW_MAX_NODES]
+    mask = np.zeros(n, dtype=bool)
+    mask[keep] = True
+    edge_mask = mask[low] & mask[high]
+    sample = nx.Graph()
+    sample.add_nodes_from(labels[keep])
+    sample.add_edges_from(zip(labels[low[edge_mask]], labels[high[edge_mask]]))
+
+    counts, edges = np.histogram(degrees, bins=DEGREE_HISTOGRAM_BINS)
+    chart_data = {
+        "large": True,
+        "graph": sample,
+        "node_count": n,
+        "degree_counts": counts,
+        "degree_edges": edges,
+    }
+    return metrics, chart_data
+
+@timed("compute")
+def compute_network(csv_path: str, pairs=None) -> tuple[dict, dict]:
+    """
+    Scalar metrics plus the data the charts need (see render_network_charts).
+    pairs: optional [(source, target), ...] to report shortest-path lengths for.
+    """
+    pairs = [tuple(pair) for pair in pairs or ()]
+    # Read CSV with edges
+    with timed("parse"):
+        df = pd.read_csv(csv_path, usecols=["source", "target"])
+
+    # Node ids in first-appearance order (source, target, source, target, ...)
+    endpoints = np.column_stack([df["source"].to_numpy(), df["target"].to_numpy()]).ravel()
+    codes, labels = pd.factorize(endpoints, use_na_sentinel=False)
+    if len(labels) > LARGE_GRAPH_NODES:
+        return _compute_large(codes, np.asarray(labels, dtype=object), pairs)
+    return _compute_small(df, pairs)
+
+@timed("render")
+def render_network_charts(chart_data: dict) -> dict:
+    """Render the network charts to PNG bytes, keyed by response key."""
+    G = chart_data["graph"]
+    large = chart_data["large"]
+
+    # Draw network graph (large graphs: sampled top-degree nodes, unlabeled)
     fig1, ax1 = plt.subplots()
     pos = nx.spring_layout(G, seed=42)
-    nx.draw(G, pos, with_labels=True, node_color="lightblue", edge_color="gray", font_weight="bold", ax=ax1)
-    network_graph = _plot_to_base64(fig1)
+    if large:
+        nx.draw(G, pos, node_size=20, width=0.3, node_color="lightblue", edge_color="gray", ax=ax1)
+        ax1.set_title(f"Top {G.number_of_nodes()} of {chart_data['node_count']} nodes by degree")
+    else:
+        nx.draw(G, pos, with_labels=True, node_color="lightblue", edge_color="gray", font_weight="bold", ax=ax1)
+    network_graph = plot_to_png(fig1)
     
     # Draw degree histogram with green bars
     fig2, ax2 = plt.subplots()
-    degrees = list(degree_dict.values())
-    ax2.bar(range(len(degrees)), degrees, color="green", edgecolor="black")
-    ax2.set_xlabel("Node Index")
-    ax2.set_ylabel("Degree")
+    if large:
+        counts, edges = chart_data["degree_counts"], chart_data["degree_edges"]
+        ax2.bar(edges[:-1], counts, width=np.diff(edges), align="edge", color="green", edgecolor="black")
+        ax2.set_yscale("log")
+        ax2.set_xlabel("Degree")
+        ax2.set_ylabel("Nodes")
+    else:
+        degrees = chart_data["degrees"]
+        ax2.bar(range(len(degrees)), degrees, color="green", edgecolor="black")
+        ax2.set_xlabel("Node Index")
+        ax2.set_ylabel("Degree")
     ax2.set_title("Degree Distribution")
-    degree_histogram = _plot_to_base64(fig2)
+    degree_histogram = plot_to_png(fig2)
     
-    # Assemble output JSON dict
-    return {
-        "edge_count": int(edge_count),
-        "highest_degree_node": str(highest_degree_node) if highest_degree_node is not None else "",
-        "average_degree": round(float(average_degree), 2),
-        "density": round(float(density), 2),
-        "shortest_path_alice_eve": int(shortest_path_alice_eve) if shortest_path_alice_eve is not None else None,
-        "network_graph": network_graph,
-        "degree_histogram": degree_histogram,
-    }
+    return {"network_graph": network_graph, "degree_histogram": degree_histogram}
+
+def analyze_network(csv_path: str, pairs=None) -> dict:
+    metrics, chart_data = compute_network(csv_path, pairs)
+    return assemble_result(RESULT_KEYS, metrics, render_network_charts(chart_data))
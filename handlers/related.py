@@ -1,52 +1,94 @@
-from utils.wikipedia_loader import find_article, load_data
+from utils.wikipedia_loader import get_dataset
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+def _flag(params: dict, name: str) -> bool:
+    value = params.get(name, "")
+    return isinstance(value, str) and value.strip().lower() in ("1", "true", "yes")
 
 def handler(request: dict) -> dict:
     """
     Given an article, return other articles from the dataset that are linked from it.
-    Query param: title=<exact article title>
+    Query params: title=<exact article title>,
+    backlinks=true to add articles linking to it ("linked_from", up to limit,
+    from offset=<n>; "linked_from_count" is the full count),
+    depth=2 to add articles two links away ("second_degree", up to limit, default 50).
     """
+    params = request["params"]
+
     # 1️⃣ Get the title param safely
-    title_param = request["params"].get("title", "")
+    title_param = params.get("title", "")
     if not isinstance(title_param, str) or not title_param.strip():
         return {"error": "Missing 'title' query parameter"}
     title_param = title_param.strip()
 
-    # 2️⃣ Find the requested article
-    article = find_article(title_param)
-    if not article:
+    depth_param = params.get("depth", "")
+    depth_param = depth_param.strip() if isinstance(depth_param, str) else ""
+    if depth_param not in ("", "1", "2"):
+        return {"error": "Depth must be 1 or 2"}
+    depth = int(depth_param) if depth_param else 1
+
+    limit_param = params.get("limit", "")
+    limit_param = limit_param.strip() if isinstance(limit_param, str) else ""
+    try:
+        limit = int(limit_param) if limit_param else DEFAULT_LIMIT
+        if limit <= 0:
+            return {"error": "Limit must be a positive integer"}
+    except ValueError:
+        limit = DEFAULT_LIMIT
+    limit = min(limit, MAX_LIMIT)
+
+    offset_param = params.get("offset", "")
+    offset_param = offset_param.strip() if isinstance(offset_param, str) else ""
+    try:
+        offset = int(offset_param) if offset_param else 0
+    except ValueError:
+        offset = 0
+    if offset < 0:
+        return {"error": "Offset must be a non-negative integer"}
+
+    # 2️⃣ Find the requested article (one dataset version for the whole request)
+    dataset = get_dataset()
+    article_id = dataset.find_article_id(title_param)
+    if article_id is None:
         return {"error": f"Article '{title_param}' not found"}
+    data = dataset.articles
+    article = data[article_id]
+    graph = dataset.indexes["link_graph"]
+    previews = dataset.indexes["previews"]
 
-    # 3️⃣ Get that article's internal links
-    link_titles = article.get("links", [])
-    if not isinstance(link_titles, list) or not link_titles:
+    def entry(target_id):
         return {
-            "title": article.get("title", title_param),
-            "related_count": 0,
-            "related_articles": [],
-            "note": "No related articles found for this article."
+            "title": data[target_id].get("title", ""),
+            "summary": previews[target_id]
         }
 
-    # 4️⃣ Build a lookup dictionary for quick matching
-    data = load_data()
-    article_lookup = {a.get("title", "").lower(): a for a in data if isinstance(a.get("title"), str)}
-
-    related = []
-    for linked_title in link_titles:
-        candidate = article_lookup.get(linked_title.lower())
-        if candidate:
-            summary = candidate.get("summary", "")
-            if isinstance(summary, str):
-                preview = summary[:150].rsplit(" ", 1)[0] + "..." if summary else ""
-            else:
-                preview = ""
-            related.append({
-                "title": candidate.get("title", linked_title),
-                "summary": preview
-            })
-
-    # 5️⃣ Return results
-    return {
+    # 3️⃣ Forward links were resolved to article ids when the dataset loaded
+    related = [entry(target_id) for target_id in graph.outgoing[article_id]]
+    result = {
         "title": article.get("title", title_param),
         "related_count": len(related),
         "related_articles": related
     }
+
+    # 4️⃣ Optional reverse links and bounded second-degree neighbourhood
+    if _flag(params, "backlinks"):
+        # Hub articles can have huge in-degrees: only the requested page is built
+        incoming = graph.incoming[article_id]
+        result["linked_from_count"] = len(incoming)
+        result["linked_from"] = [entry(source_id) for source_id in incoming[offset:offset + limit]]
+    if depth == 2:
+        second = []
+        for target_id, via_id in graph.second_degree(article_id, limit):
+            item = entry(target_id)
+            item["via"] = data[via_id].get("title", "")
+            second.append(item)
+        result["second_degree_count"] = len(second)
+        result["second_degree"] = second
+
+    if not related:
+        result["note"] = "No related articles found for this article."
+
+    # 5️⃣ Return results
+    return result
@@ -16,7 +16,8 @@ def handler(request: dict) -> dict:
                 "/stats",
                 "/random",          # optional
                 "/related?title=<article_title>",  # optional
-                "/top_categories"   # optional
+                "/top_categories",  # optional
+                "/category_articles?categories=<cat1>|<cat2>&op=and|or"  # optional
             ],
             "note": "All endpoints are relative to the base API URL."
         }
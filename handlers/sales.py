@@ -1,25 +1,106 @@
+from typing import Optional
+import numpy as np
 import pandas as pd
-import matplotlib
-matplotlib.use("Agg")
+from config import SALES_STREAM_BYTES
+from utils.charts import assemble_result, plot_to_png
+from utils.metrics import timed, timed_iter
+from utils.downsample import downsample_line
+from utils.streaming_stats import QuantileSketch, RunningCovariance, source_size
 import matplotlib.pyplot as plt
-import base64
-from io import BytesIO
-
-def _plot_to_base64(fig, max_kb: int = 100) -> str:
-    """Convert matplotlib figure to base64 PNG string under max_kb."""
-    try:
-        for dpi in (150, 120, 100, 90, 80, 70, 60):
-            buf = BytesIO()
-            fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight", pad_inches=0.1)
-            data = buf.getvalue()
-            if len(data) <= max_kb * 1024:
-                return base64.b64encode(data).decode("utf-8")
-        return base64.b64encode(data).decode("utf-8")
-    finally:
-        plt.close(fig)
 
-def analyze_sales(csv_path: str) -> dict:
-    df = pd.read_csv(csv_path)
+# Response keys in order; charts are filled in by render_sales_charts
+RESULT_KEYS = (
+    "total_sales", "top_region", "day_sales_correlation", "bar_chart",
+    "median_sales", "total_sales_tax", "cumulative_sales_chart",
+)
+
+# Streaming mode: rows per chunk and the column types it reads with
+STREAM_CHUNK_ROWS = 500_000
+STREAM_DTYPES = {"date": "category", "region": "category", "sales": "float64"}
+
+def _sales_metrics(total_sales, top_region, day_sales_correlation, median_sales) -> dict:
+    return {
+        "total_sales": round(float(total_sales), 2),
+        "top_region": str(top_region),
+        "day_sales_correlation": round(float(day_sales_correlation), 5),
+        "median_sales": round(float(median_sales), 2),
+        "total_sales_tax": round(float(total_sales * 0.10), 2),
+    }
+
+def _compute_sales_streaming(csv_path) -> tuple[dict, dict]:
+    """
+    Same metrics from one chunked pass with bounded memory: running region
+    sums, day/sales co-moments and per-date totals, plus a quantile sketch for
+    the median (within 0.5% of the exact value). Each distinct date string
+    is parsed once.
+    """
+    total_sales = 0.0
+    region_sales = {}
+    date_sales = {}
+    date_days = {}  # date string -> day of month
+    day_sales = RunningCovariance()
+    sketch = QuantileSketch()
+
+    reader = pd.read_csv(
+        csv_path, usecols=list(STREAM_DTYPES), dtype=STREAM_DTYPES, chunksize=STREAM_CHUNK_ROWS
+    )
+    for chunk in timed_iter(reader, "parse"):
+        sales = chunk["sales"]
+        total_sales += sales.sum()
+        sketch.update(sales.to_numpy())
+        for region, value in sales.groupby(chunk["region"], observed=True).sum().items():
+            region_sales[region] = region_sales.get(region, 0.0) + value
+        for date, value in sales.groupby(chunk["date"], observed=True).sum().items():
+            date_sales[date] = date_sales.get(date, 0.0) + value
+
+        # Day of month per row via the chunk's date categories
+        dates = chunk["date"].cat
+        new_dates = [d for d in dates.categories if d not in date_days]
+        if new_dates:
+            date_days.update(zip(new_dates, pd.to_datetime(pd.Index(new_dates)).day))
+        codes = np.asarray(dates.codes)
+        if len(dates.categories) == 0:
+            # No date in the whole chunk: every code is -1
+            days = np.full(len(codes), np.nan)
+        else:
+            mapped = dates.categories.map(date_days).to_numpy(dtype="float64")
+            days = np.where(codes >= 0, mapped.take(np.maximum(codes, 0)), np.nan)
+        day_sales.update(days, sales.to_numpy())
+
+    if not region_sales:
+        raise ValueError("CSV contains no sales rows")
+    sales_by_region = pd.Series(region_sales).sort_index()
+    by_date = pd.Series(date_sales)
+    by_date.index = pd.to_datetime(by_date.index)
+    by_date = by_date.sort_index()
+
+    metrics = _sales_metrics(
+        total_sales, sales_by_region.idxmax(), day_sales.correlation(), sketch.quantile(0.5)
+    )
+    dates, cumulative_sales = downsample_line(by_date.index.to_numpy(), by_date.cumsum().to_numpy())
+    chart_data = {
+        "regions": sales_by_region.index.to_numpy(),
+        "region_sales": sales_by_region.to_numpy(),
+        "dates": dates,
+        "cumulative_sales": cumulative_sales,
+    }
+    return metrics, chart_data
+
+@timed("compute")
+def compute_sales(csv_path: str, streaming: Optional[bool] = None) -> tuple[dict, dict]:
+    """
+    Scalar metrics plus the data the charts need (see render_sales_charts).
+    streaming: force chunked aggregation on/off; by default it is used for
+    inputs of SALES_STREAM_BYTES or more.
+    """
+    if streaming is None:
+        size = source_size(csv_path)
+        streaming = size is not None and size >= SALES_STREAM_BYTES
+    if streaming:
+        return _compute_sales_streaming(csv_path)
+
+    with timed("parse"):
+        df = pd.read_csv(csv_path)
 
     # Defensive checks: ensure columns exist
     if not {'sales', 'region', 'date'}.issubset(df.columns):
@@ -27,39 +108,49 @@ def analyze_sales(csv_path: str) -> dict:
     
     total_sales = df["sales"].sum()
     median_sales = df["sales"].median()
-    top_region = df.groupby("region")["sales"].sum().idxmax()
+    sales_by_region = df.groupby("region")["sales"].sum()
+    top_region = sales_by_region.idxmax()
 
     # Extract day for correlation
-    df["day"] = pd.to_datetime(df["date"]).dt.day
+    df["parsed_date"] = pd.to_datetime(df["date"])
+    df["day"] = df["parsed_date"].dt.day
     day_sales_correlation = df["day"].corr(df["sales"])
 
-    total_sales_tax = total_sales * 0.10
+    # Cumulative sales over time, in date order (not string order: 1/10 < 1/5)
+    df_sorted = df.sort_values("parsed_date", kind="stable")
+    cumulative_sales = df_sorted["sales"].cumsum()
+    dates, cumulative_sales = downsample_line(df_sorted["parsed_date"].to_numpy(), cumulative_sales.to_numpy())
 
+    metrics = _sales_metrics(total_sales, top_region, day_sales_correlation, median_sales)
+    chart_data = {
+        "regions": sales_by_region.index.to_numpy(),
+        "region_sales": sales_by_region.to_numpy(),
+        "dates": dates,
+        "cumulative_sales": cumulative_sales,
+    }
+    return metrics, chart_data
+
+@timed("render")
+def render_sales_charts(chart_data: dict) -> dict:
+    """Render the sales charts to PNG bytes, keyed by response key."""
     # Bar chart: total sales by region (blue bars)
     fig1, ax1 = plt.subplots()
-    sales_by_region = df.groupby("region")["sales"].sum()
-    ax1.bar(sales_by_region.index, sales_by_region, color="blue")
+    ax1.bar(chart_data["regions"], chart_data["region_sales"], color="blue")
     ax1.set_xlabel("Region")
     ax1.set_ylabel("Total Sales")
     ax1.set_title("Total Sales by Region")
-    bar_chart = _plot_to_base64(fig1)
+    bar_chart = plot_to_png(fig1)
 
     # Cumulative sales over time line chart (red line)
     fig2, ax2 = plt.subplots()
-    df_sorted = df.sort_values("date")
-    df_sorted["cumulative_sales"] = df_sorted["sales"].cumsum()
-    ax2.plot(df_sorted["date"], df_sorted["cumulative_sales"], color="red")
+    ax2.plot(chart_data["dates"], chart_data["cumulative_sales"], color="red")
     ax2.set_xlabel("Date")
     ax2.set_ylabel("Cumulative Sales")
     ax2.set_title("Cumulative Sales Over Time")
-    cumulative_sales_chart = _plot_to_base64(fig2)
+    cumulative_sales_chart = plot_to_png(fig2)
 
-    return {
-        "total_sales": round(float(total_sales), 2),
-        "top_region": str(top_region),
-        "day_sales_correlation": round(float(day_sales_correlation), 5),
-        "bar_chart": bar_chart,
-        "median_sales": round(float(median_sales), 2),
-        "total_sales_tax": round(float(total_sales_tax), 2),
-        "cumulative_sales_chart": cumulative_sales_chart,
-    }
+    return {"bar_chart": bar_chart, "cumulative_sales_chart": cumulative_sales_chart}
+
+def analyze_sales(csv_path: str) -> dict:
+    metrics, chart_data = compute_sales(csv_path)
+    return assemble_result(RESULT_KEYS, metrics, render_sales_charts(chart_data))
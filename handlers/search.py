@@ -1,34 +1,91 @@
-from utils.wikipedia_loader import load_data
+from utils.wikipedia_loader import get_dataset, get_title_search_index
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+def _int_param(params: dict, name: str, default: int):
+    """Parse an integer query param; invalid values fall back to default."""
+    value = params.get(name, "")
+    value = value.strip() if isinstance(value, str) else ""
+    try:
+        return int(value) if value else default
+    except ValueError:
+        return default
 
 def handler(request: dict) -> dict:
-    # 1️⃣ Extract query param
-    query = request["params"].get("q", "")
+    """
+    Searches article titles (case-insensitive substring match).
+    Query params: q=<keyword>, limit=<n> (default 20, max 100), offset=<n>,
+    mode=prefix for autocomplete (titles starting with q),
+    mode=fulltext for BM25-ranked summary search (fields=all adds categories).
+    """
+    params = request["params"]
+
+    # 1️⃣ Extract query params
+    query = params.get("q", "")
     if not isinstance(query, str) or not query.strip():
         return {"error": "Missing query parameter ?q="}
     query = query.strip().lower()
 
-    # 2️⃣ Load dataset
-    data = load_data()
-
-    # 3️⃣ Search titles for the query
-    matches = []
-    for article in data:
-        title = article.get("title", "")
-        summary = article.get("summary", "")
-        if not isinstance(title, str) or not isinstance(summary, str):
-            continue
-        if query in title.lower():
-            preview = summary[:150].rsplit(" ", 1)[0] + "..." if summary else ""
-            matches.append({
-                "title": title,
-                "summary": preview
-            })
-
-    # 4️⃣ Sort results so exact matches appear first
-    matches.sort(key=lambda m: (m["title"].lower() != query, m["title"]))
+    limit = _int_param(params, "limit", DEFAULT_LIMIT)
+    if limit <= 0:
+        return {"error": "Limit must be a positive integer"}
+    limit = min(limit, MAX_LIMIT)
+    offset = _int_param(params, "offset", 0)
+    if offset < 0:
+        return {"error": "Offset must be a non-negative integer"}
+
+    mode = params.get("mode", "")
+    mode = mode.strip().lower() if isinstance(mode, str) else ""
+    if mode not in ("", "substring", "prefix", "fulltext"):
+        return {"error": "Mode must be 'substring', 'prefix' or 'fulltext'"}
+
+    if mode == "fulltext":
+        return _fulltext(query, params, limit, offset)
+
+    # 2️⃣ Find candidate titles through the prebuilt index
+    index = get_title_search_index()
+    if mode == "prefix":
+        ids = index.prefix_matches(query)
+    else:
+        ids = index.substring_matches(query)
+
+    # 3️⃣ Rank exact matches first and return only the requested page
+    results = index.top_k(ids, query, limit, offset)
+
+    return {
+        "query": query,
+        "mode": mode or "substring",
+        "count": len(ids),
+        "limit": limit,
+        "offset": offset,
+        "results": results
+    }
+
+def _fulltext(query: str, params: dict, limit: int, offset: int) -> dict:
+    """BM25 search over summaries (and categories with fields=all)."""
+    fields = params.get("fields", "")
+    fields = fields.strip().lower() if isinstance(fields, str) else ""
+    if fields not in ("", "summary", "all"):
+        return {"error": "Fields must be 'summary' or 'all'"}
+    include_categories = fields == "all"
 
+    # Both indexes are keyed by article id, so read them from one dataset version
+    dataset = get_dataset()
+    titles = dataset.indexes["title_search"]
+    count, ranked = dataset.indexes["text_search"].search(
+        query, limit, offset, include_categories=include_categories
+    )
+    results = [
+        {"title": titles.titles[i], "summary": titles.previews[i], "score": round(score, 4)}
+        for i, score in ranked
+    ]
     return {
         "query": query,
-        "count": len(matches),
-        "results": matches
+        "mode": "fulltext",
+        "fields": "all" if include_categories else "summary",
+        "count": count,
+        "limit": limit,
+        "offset": offset,
+        "results": results
     }
@@ -1,5 +1,4 @@
-from utils.wikipedia_loader import load_data
-from collections import Counter
+from utils.wikipedia_loader import get_aggregates
 
 def handler(request: dict) -> dict:
     """
@@ -15,29 +14,22 @@ def handler(request: dict) -> dict:
     except ValueError:
         limit = 10
 
-    # 2️⃣ Load dataset
-    data = load_data()
-    if not data:
+    # 2️⃣ Read the aggregates computed when the dataset loaded
+    aggregates = get_aggregates()
+    if not aggregates["total_articles"]:
         return {"error": "Dataset is empty"}
 
-    # 3️⃣ Collect all categories safely
-    all_categories = []
-    for article in data:
-        cats = article.get("categories", [])
-        if isinstance(cats, list):
-            all_categories.extend(cats)
-
-    if not all_categories:
+    top_categories = aggregates["top_categories"]
+    if not top_categories:
         return {"error": "No categories found in dataset"}
 
-    # 4️⃣ Count frequencies & get top N
-    category_counts = Counter(all_categories)
-    top_n = category_counts.most_common(limit)
+    # 3️⃣ Top N is a slice of the precomputed ordering
+    top_n = top_categories[:limit]
 
-    # 5️⃣ Format results
+    # 4️⃣ Format results
     return {
         "limit": limit,
-        "total_unique_categories": len(category_counts),
+        "total_unique_categories": len(aggregates["category_counts"]),
         "top_categories": [
             {"category": cat, "count": count} for cat, count in top_n
         ]
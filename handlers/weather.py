@@ -1,40 +1,125 @@
+from typing import Optional
+import numpy as np
 import pandas as pd
-import matplotlib
-matplotlib.use("Agg")  # headless backend
+from config import WEATHER_STREAM_BYTES
+from utils.charts import assemble_result, plot_to_png
+from utils.metrics import timed, timed_iter
+from utils.downsample import LineSampler, downsample_line
+from utils.streaming_stats import FixedBinHistogram, RunningCovariance, RunningMoments, source_size
 import matplotlib.pyplot as plt
-import base64
-from io import BytesIO
-
-def _plot_to_base64(fig, max_kb: int = 100) -> str:
-    """Convert matplotlib figure to base64 PNG string under max_kb."""
-    try:
-        for dpi in (150, 120, 100, 90, 80, 70, 60):
-            buf = BytesIO()
-            fig.savefig(buf, format="png", dpi=dpi, bbox_inches="tight", pad_inches=0.1)
-            data = buf.getvalue()
-            if len(data) <= max_kb * 1024:
-                return base64.b64encode(data).decode("utf-8")
-        return base64.b64encode(data).decode("utf-8")
-    finally:
-        plt.close(fig)
 
-def analyze_weather(csv_path: str) -> dict:
-    df = pd.read_csv(csv_path)
+# Response keys in order; charts are filled in by render_weather_charts
+RESULT_KEYS = (
+    "average_temp_c", "max_precip_date", "min_temp_c", "temp_precip_correlation",
+    "average_precip_mm", "temp_line_chart", "precip_histogram",
+)
+
+PRECIP_HISTOGRAM_BINS = 10
+
+# Streaming mode: rows per chunk and the column types it reads with
+STREAM_CHUNK_ROWS = 500_000
+STREAM_DTYPES = {"date": "object", "temp_c": "float64", "temperature_c": "float64", "precip_mm": "float64"}
+
+def _weather_metrics(avg_temp, max_precip_date, min_temp, correlation, avg_precip) -> dict:
+    return {
+        "average_temp_c": round(float(avg_temp), 2),
+        "max_precip_date": str(max_precip_date),
+        "min_temp_c": round(float(min_temp), 2),
+        "temp_precip_correlation": round(float(correlation), 2),
+        "average_precip_mm": round(float(avg_precip), 2),
+    }
+
+def _compute_weather_streaming(csv_path) -> tuple[dict, dict]:
+    """
+    Same metrics from one chunked pass in constant memory: Welford moments for
+    the means/min and the correlation, a running argmax for the wettest date,
+    a fixed-bin histogram for precipitation and an M4-downsampled
+    (date, temperature) line.
+    """
+    temp_stats = RunningMoments()
+    precip_stats = RunningMoments()
+    temp_precip = RunningCovariance()
+    histogram = FixedBinHistogram()
+    sampler = LineSampler()
+    max_precip, max_precip_date = None, ""
+    temp_col = None
+
+    reader = pd.read_csv(
+        csv_path, usecols=lambda c: c in STREAM_DTYPES, dtype=STREAM_DTYPES, chunksize=STREAM_CHUNK_ROWS
+    )
+    for chunk in timed_iter(reader, "parse"):
+        if temp_col is None:
+            temp_col = _temperature_column(chunk.columns)
+            _check_required_columns(chunk.columns)
+        temps = chunk[temp_col].to_numpy()
+        precip = chunk["precip_mm"].to_numpy()
+        dates = chunk["date"].to_numpy()
+
+        temp_stats.update(temps)
+        precip_stats.update(precip)
+        temp_precip.update(temps, precip)
+        histogram.update(precip)
+        sampler.update(dates, temps)
+
+        # Running argmax; strict > keeps the first wettest row, like idxmax
+        if not np.isnan(precip).all():
+            position = int(np.nanargmax(precip))
+            if max_precip is None or precip[position] > max_precip:
+                max_precip, max_precip_date = precip[position], dates[position]
+
+    if temp_col is None:
+        raise ValueError("CSV contains no rows")
 
+    metrics = _weather_metrics(
+        temp_stats.mean if temp_stats.n else float("nan"),
+        max_precip_date,
+        temp_stats.min,
+        temp_precip.correlation(),
+        precip_stats.mean if precip_stats.n else float("nan"),
+    )
+    sample_dates, sample_temps = sampler.sample()
+    counts, edges = histogram.rebin(PRECIP_HISTOGRAM_BINS)
+    chart_data = {
+        "dates": sample_dates,
+        "temps": sample_temps,
+        "precip_counts": counts,
+        "precip_edges": edges,
+    }
+    return metrics, chart_data
+
+def _temperature_column(columns) -> str:
     # Check for temperature column: accept either 'temp_c' or 'temperature_c'
-    if "temp_c" in df.columns:
-        temp_col = "temp_c"
-    elif "temperature_c" in df.columns:
-        temp_col = "temperature_c"
-    else:
-        raise ValueError("CSV missing temperature column 'temp_c' or 'temperature_c'")
+    if "temp_c" in columns:
+        return "temp_c"
+    if "temperature_c" in columns:
+        return "temperature_c"
+    raise ValueError("CSV missing temperature column 'temp_c' or 'temperature_c'")
 
+def _check_required_columns(columns) -> None:
     # Required columns check (always must have 'precip_mm' and 'date')
     required_columns = {"precip_mm", "date"}
-    missing = required_columns - set(df.columns)
+    missing = required_columns - set(columns)
     if missing:
         raise ValueError(f"CSV missing required columns: {missing}")
 
+@timed("compute")
+def compute_weather(csv_path: str, streaming: Optional[bool] = None) -> tuple[dict, dict]:
+    """
+    Scalar metrics plus the data the charts need (see render_weather_charts).
+    streaming: force chunked accumulation on/off; by default it is used for
+    inputs of WEATHER_STREAM_BYTES or more.
+    """
+    if streaming is None:
+        size = source_size(csv_path)
+        streaming = size is not None and size >= WEATHER_STREAM_BYTES
+    if streaming:
+        return _compute_weather_streaming(csv_path)
+
+    with timed("parse"):
+        df = pd.read_csv(csv_path)
+    temp_col = _temperature_column(df.columns)
+    _check_required_columns(df.columns)
+
     avg_temp = df[temp_col].mean()
     min_temp = df[temp_col].min()
 
@@ -44,28 +129,41 @@ def analyze_weather(csv_path: str) -> dict:
     avg_precip = df["precip_mm"].mean()
     correlation = df[temp_col].corr(df["precip_mm"])
 
+    metrics = _weather_metrics(avg_temp, max_precip_date, min_temp, correlation, avg_precip)
+    precip = df["precip_mm"].to_numpy(dtype="float64")
+    counts, edges = np.histogram(precip[~np.isnan(precip)], bins=PRECIP_HISTOGRAM_BINS)
+    dates, temps = downsample_line(df["date"].to_numpy(), df[temp_col].to_numpy())
+    chart_data = {
+        "dates": dates,
+        "temps": temps,
+        "precip_counts": counts,
+        "precip_edges": edges,
+    }
+    return metrics, chart_data
+
+@timed("render")
+def render_weather_charts(chart_data: dict) -> dict:
+    """Render the weather charts to PNG bytes, keyed by response key."""
     # Temperature line chart
     fig1, ax1 = plt.subplots()
-    ax1.plot(df["date"], df[temp_col], color="red")
+    ax1.plot(chart_data["dates"], chart_data["temps"], color="red")
     ax1.set_xlabel("Date")
     ax1.set_ylabel("Temperature (°C)")
     ax1.set_title("Temperature Over Time")
-    temp_line_chart = _plot_to_base64(fig1)
+    temp_line_chart = plot_to_png(fig1)
 
     # Precipitation histogram
     fig2, ax2 = plt.subplots()
-    ax2.hist(df["precip_mm"], bins=10, color="orange", edgecolor="black")
+    # Binned already (in full or by the streaming histogram); weights redraw the same bars
+    edges = chart_data["precip_edges"]
+    ax2.hist(edges[:-1], bins=edges, weights=chart_data["precip_counts"], color="orange", edgecolor="black")
     ax2.set_xlabel("Precipitation (mm)")
     ax2.set_ylabel("Frequency")
     ax2.set_title("Precipitation Histogram")
-    precip_histogram = _plot_to_base64(fig2)
+    precip_histogram = plot_to_png(fig2)
 
-    return {
-        "average_temp_c": round(float(avg_temp), 2),
-        "max_precip_date": str(max_precip_date),
-        "min_temp_c": round(float(min_temp), 2),
-        "temp_precip_correlation": round(float(correlation), 2),
-        "average_precip_mm": round(float(avg_precip), 2),
-        "temp_line_chart": temp_line_chart,
-        "precip_histogram": precip_histogram,
-    }
+    return {"temp_line_chart": temp_line_chart, "precip_histogram": precip_histogram}
+
+def analyze_weather(csv_path: str) -> dict:
+    metrics, chart_data = compute_weather(csv_path)
+    return assemble_result(RESULT_KEYS, metrics, render_weather_charts(chart_data))
@@ -1,51 +1,104 @@
 from __future__ import annotations
+import base64
+import json
 import os
+import shutil
 import tempfile
 from typing import Any, Dict, Optional
 import logging
 import traceback
 import sys
 import csv
-import matplotlib
-matplotlib.use("Agg")  # headless backend for image generation
 from fastapi import FastAPI, UploadFile, File, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from fastapi.exception_handlers import request_validation_exception_handler
+from starlette.concurrency import run_in_threadpool
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+from config import ANALYSIS_POOL_SIZE, ANALYSIS_PREWARM, ANALYSIS_TIMEOUT, LOG_LEVEL
+from utils.analysis_pool import AnalysisTimeout, import_handlers, run_analysis, shutdown_pool, start_pool
+from utils.result_cache import cache_key, get_result_cache, new_hasher
+from utils.analysis_jobs import create_job, get_job
+from utils.graph_paths import parse_pairs
+from utils.metrics import render_prometheus, request_timer, timed
+from utils.wikipedia_api import router as wikipedia_router
 
-# --- Import handlers with error handling ---
-try:
-    from handlers.weather import analyze_weather
-except Exception as e:
-    analyze_weather = None
-    WEATHER_IMPORT_ERROR = e
-else:
-    WEATHER_IMPORT_ERROR = None
-
-try:
-    from handlers.sales import analyze_sales
-except Exception as e:
-    analyze_sales = None
-    SALES_IMPORT_ERROR = e
-else:
-    SALES_IMPORT_ERROR = None
-
-try:
-    from handlers.network import analyze_network
-except Exception as e:
-    analyze_network = None
-    NETWORK_IMPORT_ERROR = e
-else:
-    NETWORK_IMPORT_ERROR = None
+# --- Handlers are imported on first use, not at startup ---
+# pandas, matplotlib and networkx take seconds to import, so the analyzers are
+# referenced as "module:function" and only loaded where a job actually runs
+# (a pool worker, or this process when ANALYSIS_POOL_SIZE=0).
+HANDLER_MODULES = {
+    "analyze_weather": "handlers.weather",
+    "analyze_sales": "handlers.sales",
+    "analyze_network": "handlers.network",
+}
+
+# Split steps used by job mode: (compute metrics, render charts)
+JOB_STEPS = {
+    "analyze_weather": ("compute_weather", "render_weather_charts"),
+    "analyze_sales": ("compute_sales", "render_sales_charts"),
+    "analyze_network": ("compute_network", "render_network_charts"),
+}
+
+# Response keys of each handler in order, and which of them are charts. Same
+# as the handler modules' RESULT_KEYS, kept here so job mode never has to
+# reach a handler module (or a pool worker) just to read a constant.
+RESULT_KEYS = {
+    "analyze_weather": (
+        "average_temp_c", "max_precip_date", "min_temp_c", "temp_precip_correlation",
+        "average_precip_mm", "temp_line_chart", "precip_histogram",
+    ),
+    "analyze_sales": (
+        "total_sales", "top_region", "day_sales_correlation", "bar_chart",
+        "median_sales", "total_sales_tax", "cumulative_sales_chart",
+    ),
+    "analyze_network": (
+        "edge_count", "highest_degree_node", "average_degree", "density",
+        "shortest_path_alice_eve", "shortest_paths", "path_stats",
+        "network_graph", "degree_histogram",
+    ),
+}
+CHART_KEYS = {
+    "analyze_weather": ("temp_line_chart", "precip_histogram"),
+    "analyze_sales": ("bar_chart", "cumulative_sales_chart"),
+    "analyze_network": ("network_graph", "degree_histogram"),
+}
+
+def _handler_ref(handler_name: str, func_name: str) -> str:
+    return f"{HANDLER_MODULES[handler_name]}:{func_name}"
 
 app = FastAPI(title="TDS Project – Data Analyst API")
+# GET /search, /summary, /links, ... (ETag + If-None-Match)
+app.include_router(wikipedia_router)
+
+# Uploads are read in chunks of this size instead of all at once
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=LOG_LEVEL,
     format="%(asctime)s [%(levelname)s] %(message)s",
     handlers=[logging.StreamHandler(sys.stdout)],
 )
 
+def _prewarm():
+    # Pool workers import the handlers themselves; in-process analysis needs them here
+    if ANALYSIS_POOL_SIZE <= 0:
+        import_handlers()
+        logging.info("Analysis handlers imported")
+    else:
+        start_pool()
+
+@app.on_event("startup")
+async def warm_analysis_pool():
+    # Warm up in the background once serving, so startup isn't delayed
+    if ANALYSIS_PREWARM:
+        asyncio.get_running_loop().run_in_executor(None, _prewarm)
+
+@app.on_event("shutdown")
+def stop_analysis_pool():
+    shutdown_pool()
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     logging.error(f"Request validation error at {request.url}:\n{exc.errors()}")
@@ -68,79 +121,134 @@ def root() -> Dict[str, Any]:
         "hint": "POST a CSV file to / with filename containing 'weather', 'sales', or 'network'."
     }
 
-def _save_upload_to_temp(upload: UploadFile, suffix: str = ".csv") -> str:
+async def _read_header_line(upload: UploadFile) -> tuple[bytes, bytes]:
+    """
+    Read the first chunk(s) of an upload until the header line is complete.
+    Returns (header line, all bytes read so far).
+    """
+    head = await upload.read(UPLOAD_CHUNK_SIZE)
+    while b"\n" not in head:
+        chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        head += chunk
+    return head.split(b"\n", 1)[0], head
+
+def _parse_header_line(header_line: bytes) -> list[str]:
+    return next(csv.reader([header_line.decode("utf-8-sig").rstrip("\r")]))
+
+def _hash_upload(upload: UploadFile, head: bytes) -> str:
+    """Hash an upload (the bytes already read plus the rest) and rewind it."""
+    hasher = new_hasher()
+    hasher.update(head)
+    while True:
+        chunk = upload.file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        hasher.update(chunk)
+    upload.file.seek(0)
+    return hasher.hexdigest()
+
+def _copy_to_temp(upload: UploadFile, suffix: str = ".csv") -> str:
+    """Copy a (rewound) upload to a temp file that a pool worker can open."""
+    # request.form() has already spooled the upload to an unnamed temp file,
+    # which pool workers can't open, so this is a second copy on disk
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        shutil.copyfileobj(upload.file, tmp, UPLOAD_CHUNK_SIZE)
+        logging.debug("Saved upload to temp file %s (%d bytes)", tmp.name, tmp.tell())
+        return tmp.name
+
+async def _ingest_upload(upload: UploadFile, validate) -> tuple[Optional[str], Optional[str]]:
+    """
+    Validate the CSV header from the first chunk, then hash the upload for
+    the result cache and rewind it. Nothing is copied here: a cache hit
+    needs no file at all, and a miss gets one from _analysis_source.
+    Returns (content hash, validation error or None).
+    """
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            data = upload.file.read()
-            tmp.write(data)
-            logging.debug(f"Saved upload to temp file {tmp.name} ({len(data)} bytes)")
-            return tmp.name
-    finally:
-        try:
-            upload.file.close()
-        except Exception as e:
-            logging.warning(f"Failed to close upload file: {e}")
+        header_line, head = await _read_header_line(upload)
+        with timed("validate"):
+            headers = _parse_header_line(header_line)
+    except Exception as e:
+        return None, f"Failed to read CSV headers: {e}"
+    logging.debug("CSV header line in '%s': %r", upload.filename, header_line)
+    with timed("validate"):
+        val_error = validate(headers)
+    if val_error:
+        return None, val_error
+    digest = await run_in_threadpool(_hash_upload, upload, head)
+    return digest, None
+
+async def _analysis_source(upload: UploadFile) -> tuple[Any, Optional[str]]:
+    """
+    Something the analyzer can parse directly in a single pass: the upload's
+    own file object when analyses run in-process, or a temp file when they
+    run on the process pool. Returns (source, temp path or None).
+    """
+    if ANALYSIS_POOL_SIZE <= 0:
+        return upload.file, None
+    csv_path = await run_in_threadpool(_copy_to_temp, upload)
+    return csv_path, csv_path
 
-def _call_handler_or_500(handler_name: str, func: Optional[callable], csv_path: str) -> Dict[str, Any]:
-    if func is None:
-        extra = None
-        if handler_name == "analyze_weather":
-            extra = WEATHER_IMPORT_ERROR
-        elif handler_name == "analyze_sales":
-            extra = SALES_IMPORT_ERROR
-        elif handler_name == "analyze_network":
-            extra = NETWORK_IMPORT_ERROR
-        logging.error(f"Handler {handler_name} unavailable: {extra}")
-        raise HTTPException(status_code=500, detail=f"Handler {handler_name} unavailable: {extra}")
+async def _call_handler_or_500(handler_name: str, func: str, csv_source: Any, *args) -> Any:
     try:
-        result = func(csv_path)
-        logging.debug(f"Handler {handler_name} returned keys: {list(result.keys())}")
-        for k, v in result.items():
-            if isinstance(v, str) and len(v) > 100:
-                logging.debug(f"Key '{k}' is a large string with length {len(v)}")
-            else:
-                logging.debug(f"Key '{k}': {v} ({type(v)})")
+        result = await run_analysis(func, csv_source, *args)
+        # Dumping every key is only worth its cost when DEBUG is on
+        if isinstance(result, dict) and logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug(f"Handler {handler_name} returned keys: {list(result.keys())}")
+            for k, v in result.items():
+                if isinstance(v, str) and len(v) > 100:
+                    logging.debug(f"Key '{k}' is a large string with length {len(v)}")
+                else:
+                    logging.debug(f"Key '{k}': {v} ({type(v)})")
         return result
+    except AnalysisTimeout:
+        logging.error(f"Handler {handler_name} timed out after {ANALYSIS_TIMEOUT}s")
+        raise HTTPException(status_code=504, detail=f"Handler {handler_name} timed out after {ANALYSIS_TIMEOUT}s")
+    except BrokenProcessPool as exc:
+        logging.error(f"Analysis worker crashed in handler {handler_name}: {exc}")
+        raise HTTPException(status_code=503, detail=f"Handler {handler_name} failed: analysis worker crashed")
+    except ImportError as exc:
+        logging.error(f"Handler {handler_name} unavailable: {exc}")
+        raise HTTPException(status_code=500, detail=f"Handler {handler_name} unavailable: {exc}")
     except Exception as exc:
         logging.error(f"Exception in handler {handler_name}: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Handler {handler_name} failed: {exc}")
 
-def _validate_weather_csv_headers(csv_path: str, required_columns: set[str]) -> Optional[str]:
-    try:
-        with open(csv_path, newline='', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            headers = next(reader)
-            headers_set = set(h.lower() for h in headers)
-            if not ({"temp_c", "temperature_c"} & headers_set):
-                return "CSV missing required column: 'temp_c' or 'temperature_c'"
-
-            if not required_columns.issubset(headers_set):
-                missing = required_columns - headers_set
-                missing.discard("temp_c")
-                missing.discard("temperature_c")
-                if missing:
-                    return f"CSV missing required columns: {missing}"
+def _validate_weather_csv_headers(headers: list[str], required_columns: set[str]) -> Optional[str]:
+    headers_set = set(h.lower() for h in headers)
+    if not ({"temp_c", "temperature_c"} & headers_set):
+        return "CSV missing required column: 'temp_c' or 'temperature_c'"
 
-    except Exception as e:
-        return f"Failed to read CSV headers: {e}"
+    if not required_columns.issubset(headers_set):
+        missing = required_columns - headers_set
+        missing.discard("temp_c")
+        missing.discard("temperature_c")
+        if missing:
+            return f"CSV missing required columns: {missing}"
     return None
 
-def _validate_csv_headers(csv_path: str, required_columns: set[str]) -> Optional[str]:
-    try:
-        with open(csv_path, newline='', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            headers = next(reader)
-            headers_set = set(h.lower() for h in headers)
-            if not required_columns.issubset(headers_set):
-                return f"CSV missing required columns: {required_columns - headers_set}"
-    except Exception as e:
-        return f"Failed to read CSV headers: {e}"
+def _validate_csv_headers(headers: list[str], required_columns: set[str]) -> Optional[str]:
+    headers_set = set(h.lower() for h in headers)
+    if not required_columns.issubset(headers_set):
+        return f"CSV missing required columns: {required_columns - headers_set}"
     return None
 
 @app.post("/")
 async def analyze_csv(request: Request):
-    form = await request.form()
-    logging.info(f"Received form fields: {list(form.keys())}")
+    with request_timer("analyze_csv") as timer:
+        try:
+            response = await _analyze_csv(request, timer)
+        except HTTPException as exc:
+            timer.status = exc.status_code
+            raise
+        timer.status = response.status_code
+        return response
+
+async def _analyze_csv(request: Request, timer):
+    with timed("upload_read"):
+        form = await request.form()
+    logging.info("Received form fields: %s", list(form.keys()))
     upload_file = None
     upload_key = None
     # Find CSV file with expected keywords including "edges" mapped to network
@@ -157,44 +265,167 @@ async def analyze_csv(request: Request):
             status_code=400,
             content={"detail": "No CSV file found with 'network', 'edges', 'sales', or 'weather' in filename."},
         )
-    logging.info(f"Using uploaded file from field '{upload_key}': {upload_file.filename}")
+    logging.info("Using uploaded file from field '%s': %s", upload_key, upload_file.filename)
     filename = upload_file.filename.lower()
     if any(keyword in filename for keyword in ["network", "edges"]):
-        handler = analyze_network
         handler_name = "analyze_network"
         required_cols = {"source", "target"}  # adjust if your network handler requires specific columns
     elif "sales" in filename:
-        handler = analyze_sales
         handler_name = "analyze_sales"
         required_cols = {"sales", "region", "date"}
     elif "weather" in filename:
-        handler = analyze_weather
         handler_name = "analyze_weather"
         required_cols = {"precip_mm", "date"}  # temp_c handled in weather validator separately
     else:
         logging.error(f"Filename '{filename}' does not contain required keywords after selection")
         return JSONResponse(status_code=400, content={"detail": "Filename must contain 'network', 'edges', 'sales', or 'weather'."})
-    csv_path = _save_upload_to_temp(upload_file)
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        header_line = f.readline().strip()
-    logging.debug(f"CSV header line in '{upload_file.filename}': {header_line}")
+    timer.endpoint = handler_name
+    mode = form.get("mode") or request.query_params.get("mode") or ""
+    job_mode = isinstance(mode, str) and mode.strip().lower() == "job"
+    # Extra handler arguments; network uploads may ask for shortest paths
+    # between node pairs ("pairs=Alice:Eve,Bob:Dan")
+    handler_args = ()
+    cache_options = ""
+    pairs_field = form.get("pairs") or request.query_params.get("pairs") or ""
+    if handler_name == "analyze_network" and isinstance(pairs_field, str) and pairs_field.strip():
+        try:
+            pairs = parse_pairs(pairs_field)
+        except ValueError as e:
+            logging.error(f"Invalid pairs field: {e}")
+            return JSONResponse(status_code=400, content={"detail": str(e)})
+        handler_args = (pairs,)
+        cache_options = repr(pairs)
     if handler_name == "analyze_weather":
-        val_error = _validate_weather_csv_headers(csv_path, required_cols)
+        validate = lambda headers: _validate_weather_csv_headers(headers, required_cols)
     else:
-        val_error = _validate_csv_headers(csv_path, required_cols)
-    if val_error:
-        logging.error(val_error)
-        try:
-            os.remove(csv_path)
-        except Exception:
-            pass
-        return JSONResponse(status_code=400, content={"detail": val_error})
+        validate = lambda headers: _validate_csv_headers(headers, required_cols)
+    temp_path = None
     try:
-        result = _call_handler_or_500(handler_name, handler, csv_path)
+        with timed("upload_read"):
+            digest, val_error = await _ingest_upload(upload_file, validate)
+        if val_error:
+            logging.error(val_error)
+            return JSONResponse(status_code=400, content={"detail": val_error})
+
+        # Byte-identical re-uploads are answered from the result cache
+        cache = get_result_cache()
+        key = cache_key(handler_name, digest, cache_options)
+        if cache is not None:
+            body = cache.get(key)
+            if body is not None:
+                logging.info("Result cache hit for %s (%s)", handler_name, digest)
+                if job_mode:
+                    return _cached_job_response(handler_name, body)
+                return Response(content=body, media_type="application/json", headers={"X-Cache": "HIT"})
+
+        with timed("upload_read"):
+            source, temp_path = await _analysis_source(upload_file)
+
+        if job_mode:
+            # Metrics now, charts rendered in the background (GET /jobs/{id})
+            compute, render = (_handler_ref(handler_name, step) for step in JOB_STEPS[handler_name])
+            metrics, chart_data = await _call_handler_or_500(handler_name, compute, source, *handler_args)
+            job = create_job(handler_name, CHART_KEYS[handler_name])
+            task = asyncio.create_task(
+                _render_job(job, render, chart_data, RESULT_KEYS[handler_name], metrics, cache, key)
+            )
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+            return _job_response(job, metrics, "MISS")
+
+        handler = _handler_ref(handler_name, handler_name)
+        result = await _call_handler_or_500(handler_name, handler, source, *handler_args)
     finally:
         try:
-            os.remove(csv_path)
-            logging.debug(f"Deleted temporary file {csv_path}")
+            await upload_file.close()
         except Exception as e:
-            logging.warning(f"Could not delete temp file {csv_path}: {e}")
-    return JSONResponse(content=result)
+            logging.warning(f"Failed to close upload file: {e}")
+        if temp_path:
+            try:
+                os.remove(temp_path)
+                logging.debug("Deleted temporary file %s", temp_path)
+            except Exception as e:
+                logging.warning(f"Could not delete temp file {temp_path}: {e}")
+    with timed("encode"):
+        response = JSONResponse(content=result, headers={"X-Cache": "MISS"})
+    if cache is not None:
+        cache.put(key, response.body)
+    return response
+
+def _job_response(job, metrics: dict, cache_status: str) -> JSONResponse:
+    """202 with the metrics and the job describing where the charts are."""
+    content = dict(metrics)
+    content["job"] = job.describe(f"/jobs/{job.job_id}")
+    with timed("encode"):
+        return JSONResponse(status_code=202, content=content, headers={"X-Cache": cache_status})
+
+def _cached_job_response(handler_name: str, body: bytes) -> JSONResponse:
+    """
+    Job-mode answer for a cached result: the same 202 shape as a miss, with
+    a job that is already done and serves the cached charts.
+    """
+    result = json.loads(body)
+    chart_keys = CHART_KEYS[handler_name]
+    charts = {name: base64.b64decode(result[name]) for name in chart_keys}
+    metrics = {k: v for k, v in result.items() if k not in charts}
+    job = create_job(handler_name, chart_keys)
+    job.finish(charts)
+    return _job_response(job, metrics, "HIT")
+
+# Keeps references to in-flight chart jobs so they aren't garbage collected
+_background_tasks = set()
+
+async def _render_job(job, render, chart_data, result_keys, metrics, cache, key) -> None:
+    # Timed as its own request, since the upload that started it has returned
+    with request_timer(f"{job.handler_name}_charts") as timer:
+        await _run_render_job(job, render, chart_data, result_keys, metrics, cache, key)
+        timer.status = job.status
+
+async def _run_render_job(job, render, chart_data, result_keys, metrics, cache, key) -> None:
+    try:
+        charts = await run_analysis(render, chart_data)
+    except AnalysisTimeout:
+        logging.error(f"Chart job {job.job_id} timed out after {ANALYSIS_TIMEOUT}s")
+        job.fail(f"Chart rendering timed out after {ANALYSIS_TIMEOUT}s")
+        return
+    except Exception as exc:
+        logging.error(f"Chart job {job.job_id} failed: {traceback.format_exc()}")
+        job.fail(f"Chart rendering failed: {exc}")
+        return
+    job.finish(charts)
+    # The full response is now known, so later identical uploads hit the cache
+    if cache is not None:
+        try:
+            result = await run_analysis("utils.charts:assemble_result", result_keys, metrics, charts)
+        except Exception as exc:
+            logging.warning(f"Could not cache result of chart job {job.job_id}: {exc}")
+            return
+        with timed("encode"):
+            body = JSONResponse(content=result).body
+        cache.put(key, body)
+
+@app.get("/metrics")
+def metrics_endpoint():
+    """Request and stage latency histograms in the Prometheus text format."""
+    return Response(content=render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job.describe(f"/jobs/{job_id}")
+
+@app.get("/jobs/{job_id}/charts/{chart_file}")
+def job_chart(job_id: str, chart_file: str):
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    chart_name = chart_file[:-4] if chart_file.endswith(".png") else chart_file
+    if chart_name not in job.chart_names:
+        raise HTTPException(status_code=404, detail=f"Chart '{chart_name}' not found")
+    if job.status == "pending":
+        return JSONResponse(status_code=202, content={"status": "pending"}, headers={"Retry-After": "1"})
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=job.error)
+    return Response(content=job.charts[chart_name], media_type="image/png")
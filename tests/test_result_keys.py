@@ -0,0 +1,17 @@
+import importlib
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("pandas")
+pytest.importorskip("matplotlib")
+pytest.importorskip("networkx")
+
+import main
+
+@pytest.mark.parametrize("handler_name", sorted(main.HANDLER_MODULES))
+def test_result_keys_match_handler_modules(handler_name):
+    # main keeps its own copy so job mode needn't import the handlers
+    module = importlib.import_module(main.HANDLER_MODULES[handler_name])
+    assert main.RESULT_KEYS[handler_name] == module.RESULT_KEYS
+    assert set(main.CHART_KEYS[handler_name]) <= set(module.RESULT_KEYS)
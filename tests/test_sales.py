@@ -0,0 +1,36 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("matplotlib")
+
+from handlers import sales
+
+def test_streaming_handles_chunk_without_dates(tmp_path, monkeypatch):
+    # Two-row chunks: the first chunk has no dates at all
+    monkeypatch.setattr(sales, "STREAM_CHUNK_ROWS", 2)
+    path = tmp_path / "sales.csv"
+    path.write_text(
+        "date,region,sales\n"
+        ",West,10\n"
+        ",East,20\n"
+        "2025-01-01,West,30\n"
+        "2025-01-02,East,40\n"
+        "2025-01-03,West,50\n",
+        encoding="utf-8",
+    )
+    streamed, _ = sales.compute_sales(str(path), streaming=True)
+    in_memory, _ = sales.compute_sales(str(path), streaming=False)
+    assert streamed["total_sales"] == in_memory["total_sales"] == 150
+    assert streamed["top_region"] == in_memory["top_region"] == "West"
+    assert streamed["day_sales_correlation"] == pytest.approx(in_memory["day_sales_correlation"])
+
+def test_cumulative_sales_follow_parsed_dates(tmp_path):
+    # Non-ISO dates: string order would put 1/10 before 1/2
+    days = list(range(1, 32)) * 10
+    rows = "".join(f"1/{day}/2024,West,{day}\n" for day in days)
+    path = tmp_path / "sales.csv"
+    path.write_text("date,region,sales\n" + rows, encoding="utf-8")
+    _, chart_data = sales.compute_sales(str(path), streaming=False)
+    dates = pd.to_datetime(chart_data["dates"])
+    assert dates.is_monotonic_increasing
+    assert chart_data["cumulative_sales"][-1] == sum(days)
@@ -0,0 +1,54 @@
+import json
+import random
+
+import pytest
+
+from utils.wikipedia_reader import iter_json_array
+
+CHUNK_SIZES = (1, 2, 3, 5, 1 << 20)
+
+def _read(tmp_path, text, chunk_size):
+    path = tmp_path / "data.json"
+    path.write_text(text, encoding="utf-8")
+    return list(iter_json_array(str(path), chunk_size))
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("text", [
+    "[]",
+    " [ ] \n",
+    "[1.5]",
+    "[1.5, -12.5e-3, 3E+2]",
+    '[{"title": "a,]b", "links": [1, 2]}, "x", true, null]',
+    "[1,2]  \n",
+])
+def test_valid_arrays_match_json_loads(tmp_path, text, chunk_size):
+    assert _read(tmp_path, text, chunk_size) == json.loads(text)
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("text", [
+    "",
+    "[",
+    "[1,2",
+    "[1 2]",
+    "[1,]",
+    "[,1]",
+    "[1.x]",
+    "[1,2]x",
+    "[1,2]]",
+    "{}",
+])
+def test_malformed_arrays_raise(tmp_path, text, chunk_size):
+    with pytest.raises(json.JSONDecodeError):
+        _read(tmp_path, text, chunk_size)
+
+def test_fuzz_small_chunks(tmp_path):
+    rng = random.Random(0)
+    for _ in range(200):
+        value = [
+            rng.choice([rng.randint(-999, 999), rng.random() * 1e3, "s" * rng.randint(0, 3),
+                        {"k": [1.25, 2]}, None, True])
+            for _ in range(rng.randint(0, 6))
+        ]
+        text = json.dumps(value, separators=(rng.choice([",", ", "]), ":"))
+        for chunk_size in (1, 3):
+            assert _read(tmp_path, text, chunk_size) == value
@@ -0,0 +1,62 @@
+"""
+In-memory registry of deferred chart-rendering jobs for POST / ?mode=job.
+
+The POST answers with the scalar metrics and a job id as soon as they are
+computed; charts render in the background and are fetched later as PNGs.
+Jobs live in the worker process that created them and expire after
+JOB_TTL seconds.
+"""
+import threading
+import time
+import uuid
+from typing import Optional
+
+from config import JOB_TTL
+
+class AnalysisJob:
+    def __init__(self, handler_name: str, chart_names):
+        self.job_id = uuid.uuid4().hex
+        self.handler_name = handler_name
+        self.chart_names = tuple(chart_names)
+        self.status = "pending"  # pending -> done | failed
+        self.charts = {}         # chart name -> PNG bytes
+        self.error = None
+        self.created = time.monotonic()
+
+    def finish(self, charts: dict) -> None:
+        self.charts = charts
+        self.status = "done"
+
+    def fail(self, error: str) -> None:
+        self.error = error
+        self.status = "failed"
+
+    def describe(self, base_url: str) -> dict:
+        info = {
+            "job_id": self.job_id,
+            "status": self.status,
+            "charts": {name: f"{base_url}/charts/{name}.png" for name in self.chart_names},
+        }
+        if self.error:
+            info["error"] = self.error
+        return info
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+def _prune(now: float) -> None:
+    expired = [job_id for job_id, job in _jobs.items() if now - job.created > JOB_TTL]
+    for job_id in expired:
+        del _jobs[job_id]
+
+def create_job(handler_name: str, chart_names) -> AnalysisJob:
+    job = AnalysisJob(handler_name, chart_names)
+    with _jobs_lock:
+        _prune(job.created)
+        _jobs[job.job_id] = job
+    return job
+
+def get_job(job_id: str) -> Optional[AnalysisJob]:
+    with _jobs_lock:
+        _prune(time.monotonic())
+        return _jobs.get(job_id)
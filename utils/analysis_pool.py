@@ -0,0 +1,148 @@
+"""
+Process pool that runs the CSV analyzers off the event loop.
+
+Workers are started with pandas, matplotlib (Agg) and networkx already
+imported, so the first upload doesn't pay the import cost. Jobs may name
+their function as "module:function"; it is then imported where the job
+runs, so the web process itself never has to load the analyzers. Each job runs
+under a SIGALRM timer inside the worker, so a runaway analysis fails on its
+own without taking the worker (or other jobs) down. Stages the job times
+(utils.metrics.timed) are sent back and merged into the calling request.
+"""
+import asyncio
+import importlib
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config import ANALYSIS_POOL_SIZE, ANALYSIS_TIMEOUT
+from utils.metrics import collect_stages, current_timer
+
+class AnalysisTimeout(Exception):
+    """Raised when an analysis job runs longer than ANALYSIS_TIMEOUT."""
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _warm_worker():
+    """Pool initializer: import the heavy libraries and handlers once per worker."""
+    import_handlers()
+
+def import_handlers():
+    """Import the analyzers (and with them pandas, matplotlib/Agg, networkx)."""
+    import handlers.network  # noqa: F401
+    import handlers.sales  # noqa: F401
+    import handlers.weather  # noqa: F401
+
+def resolve(func):
+    """A callable, or a "module:function" reference imported on first use."""
+    if isinstance(func, str):
+        module_name, _, name = func.partition(":")
+        return getattr(importlib.import_module(module_name), name)
+    return func
+
+def _ping():
+    return os.getpid()
+
+def _on_alarm(signum, frame):
+    raise AnalysisTimeout()
+
+def _run_job(func, args, timeout):
+    """Worker-side wrapper: run func(*args) under a wall-clock alarm; returns (result, stage timings)."""
+    # Signals only work in the main thread, i.e. in pool workers, not in the
+    # thread fallback used when the pool is disabled
+    use_alarm = (
+        timeout and hasattr(signal, "SIGALRM")
+        and threading.current_thread() is threading.main_thread()
+    )
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        with collect_stages() as stages:
+            result = resolve(func)(*args)
+        return result, stages
+    except AnalysisTimeout:
+        # The job was cut off mid-chart; don't leave its figures in a long-lived worker
+        if use_alarm and "matplotlib.pyplot" in sys.modules:
+            sys.modules["matplotlib.pyplot"].close("all")
+        raise
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+def get_pool():
+    """Return the shared pool (created on first use), or None when ANALYSIS_POOL_SIZE is 0."""
+    global _pool
+    if ANALYSIS_POOL_SIZE <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=ANALYSIS_POOL_SIZE, initializer=_warm_worker)
+        return _pool
+
+def start_pool():
+    """Spawn and warm every worker up front (call from app startup)."""
+    pool = get_pool()
+    if pool is None:
+        return
+    # Concurrent no-op jobs make the executor start all of its workers
+    for future in [pool.submit(_ping) for _ in range(ANALYSIS_POOL_SIZE)]:
+        future.result()
+    logging.info(f"Analysis pool ready with {ANALYSIS_POOL_SIZE} workers")
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+def _discard_broken_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+async def run_analysis(func, *args, timeout: float = ANALYSIS_TIMEOUT):
+    """
+    Run func(*args) on the process pool (or a thread when the pool is
+    disabled) without blocking the event loop. Raises AnalysisTimeout when
+    the job exceeds timeout seconds. The job's stage timings are added to
+    the current request, with the rest of its wall time as "dispatch"
+    (queueing, pickling and untimed work in the worker).
+    """
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    pool = get_pool()
+    job = loop.run_in_executor(pool, _run_job, func, args, timeout)
+    try:
+        if pool is None:
+            # Thread fallback: no SIGALRM there, so the wait itself is the
+            # limit. The thread can't be cancelled and runs on (holding its
+            # executor slot) until the analysis finishes.
+            limit = timeout or None
+        else:
+            # The worker enforces the timeout itself; this is a backstop for
+            # platforms without SIGALRM or a worker that ignores the signal
+            limit = timeout + 5 if timeout else None
+        result, stages = await asyncio.wait_for(job, limit)
+    except asyncio.TimeoutError:
+        raise AnalysisTimeout()
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); start a fresh pool next time
+        if pool is not None:
+            _discard_broken_pool(pool)
+        raise
+    timer = current_timer()
+    if timer is not None:
+        timer.merge(stages)
+        timer.add("dispatch", max(0.0, time.perf_counter() - started - sum(stages.values())))
+    return result
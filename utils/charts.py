@@ -0,0 +1,65 @@
+"""
+Shared chart encoding for the CSV analyzers.
+
+A figure is rasterized exactly once. If the PNG is over the size budget it
+is shrunk on the raster itself — first by quantizing to a 256-colour
+palette (charts use few colours, so this is visually lossless), then by
+downscaling to the area the budget allows — instead of re-running
+savefig at ever lower DPIs.
+"""
+import base64
+import math
+from io import BytesIO
+
+import matplotlib
+matplotlib.use("Agg")  # headless backend, set once for every analyzer
+import matplotlib.pyplot as plt
+from PIL import Image
+
+from utils.metrics import timed
+
+RENDER_DPI = 150
+# Downscale attempts after quantization; each one targets the remaining ratio
+MAX_DOWNSCALES = 2
+
+def _encode_png(image: Image.Image) -> bytes:
+    buf = BytesIO()
+    image.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+def _quantize(image: Image.Image) -> Image.Image:
+    return image.convert("RGB").quantize(colors=256, method=Image.Quantize.MEDIANCUT)
+
+def plot_to_png(fig, max_kb: int = 100) -> bytes:
+    """Render a matplotlib figure to PNG bytes under max_kb (closes the figure)."""
+    budget = max_kb * 1024
+    try:
+        buf = BytesIO()
+        fig.savefig(buf, format="png", dpi=RENDER_DPI, bbox_inches="tight", pad_inches=0.1)
+        data = buf.getvalue()
+    finally:
+        plt.close(fig)
+    if len(data) <= budget:
+        return data
+
+    image = Image.open(BytesIO(data))
+    image.load()
+    data = _encode_png(_quantize(image))
+    for _ in range(MAX_DOWNSCALES):
+        if len(data) <= budget:
+            break
+        # PNG size scales roughly with pixel area; aim a little under budget
+        scale = math.sqrt(budget / len(data)) * 0.95
+        width = max(1, int(image.width * scale))
+        height = max(1, int(image.height * scale))
+        image = image.resize((width, height), Image.LANCZOS)
+        data = _encode_png(_quantize(image))
+    return data
+
+@timed("encode")
+def assemble_result(keys, metrics: dict, charts: dict) -> dict:
+    """Merge scalar metrics and PNG charts (base64-encoded) into one response in key order."""
+    return {
+        key: metrics[key] if key in metrics else base64.b64encode(charts[key]).decode("utf-8")
+        for key in keys
+    }
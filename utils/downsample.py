@@ -0,0 +1,103 @@
+"""
+Downsampling of long line-chart series before plotting.
+
+A line drawn into W pixel columns can only show, per column, where the
+line enters, where it leaves and its lowest and highest point. So
+splitting the series into W buckets and keeping the first, last, min and
+max point of each (the M4 reduction) draws the same picture from at most
+4 * W points, however many rows the CSV had. Series already that short
+are returned untouched.
+
+Date strings are plotted as a categorical axis with one tick label per
+row, which past a few hundred points costs far more than the line itself
+(and prints as a solid smear), so longer series get a real date axis.
+"""
+import numpy as np
+import pandas as pd
+
+# Default matplotlib figure width (6.4 in) at the chart RENDER_DPI (150)
+PLOT_WIDTH_PX = 960
+MAX_LINE_POINTS = 4 * PLOT_WIDTH_PX
+# Longer string x-values are parsed to dates instead of drawn as categories
+MAX_CATEGORY_POINTS = 200
+
+def m4_indices(y, buckets: int = PLOT_WIDTH_PX) -> np.ndarray:
+    """Sorted indices of the first, last, min and max point in each of `buckets` equal-count runs."""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= 4 * buckets:
+        return np.arange(n)
+    bounds = np.linspace(0, n, buckets + 1).astype(np.int64)
+    starts, ends = bounds[:-1], bounds[1:] - 1
+    # NaNs would win argmin/argmax; treat them as neutral within their bucket
+    low = np.where(np.isnan(y), np.inf, y)
+    high = np.where(np.isnan(y), -np.inf, y)
+    mins = starts + _segment_arg(low, bounds, np.minimum)
+    maxs = starts + _segment_arg(high, bounds, np.maximum)
+    return np.unique(np.concatenate([starts, ends, mins, maxs]))
+
+def _segment_arg(values: np.ndarray, bounds: np.ndarray, ufunc) -> np.ndarray:
+    """Offset of each segment's extreme (first occurrence) from the segment start."""
+    extremes = ufunc.reduceat(values, bounds[:-1])
+    lengths = np.diff(bounds)
+    hit = values == np.repeat(extremes, lengths)
+    positions = np.arange(len(values))
+    # First hit per segment: smallest position among hits
+    first = np.minimum.reduceat(np.where(hit, positions, len(values)), bounds[:-1])
+    return first - bounds[:-1]
+
+def as_plot_x(x) -> np.ndarray:
+    """Date-like strings as datetime64 (so the axis isn't one category per row); anything else unchanged."""
+    x = np.asarray(x)
+    if x.dtype.kind not in "OUS":
+        return x
+    parsed = pd.to_datetime(pd.Series(x), errors="coerce")
+    if parsed.isna().any():
+        return x
+    return parsed.to_numpy()
+
+def downsample_line(x, y, max_points: int = MAX_LINE_POINTS) -> tuple[np.ndarray, np.ndarray]:
+    """(x, y) reduced with M4 to at most max_points; short series come back as they are."""
+    x, y = np.asarray(x), np.asarray(y)
+    if len(y) <= MAX_CATEGORY_POINTS:
+        return x, y
+    if len(y) > max_points:
+        keep = m4_indices(y, max(1, max_points // 4))
+        x, y = x[keep], y[keep]
+    return as_plot_x(x), y
+
+class LineSampler:
+    """
+    Streaming version of downsample_line: each chunk is reduced with M4 and
+    appended; when the kept points pass 2 * max_points they are reduced
+    again. M4 of M4 output keeps every bucket's extremes, so spikes survive.
+    """
+
+    def __init__(self, max_points: int = MAX_LINE_POINTS):
+        self.max_points = max_points
+        self.x = []
+        self.y = []
+        self.kept = 0
+        self.seen = 0
+
+    def update(self, x, y) -> None:
+        x, y = np.asarray(x), np.asarray(y)
+        self.seen += len(y)
+        keep = m4_indices(y, max(1, self.max_points // 4))
+        self.x.append(x[keep])
+        self.y.append(y[keep])
+        self.kept += len(keep)
+        if self.kept > 2 * self.max_points:
+            x, y = np.concatenate(self.x), np.concatenate(self.y)
+            keep = m4_indices(y, max(1, self.max_points // 4))
+            self.x, self.y = [x[keep]], [y[keep]]
+            self.kept = len(keep)
+
+    def sample(self) -> tuple[np.ndarray, np.ndarray]:
+        if not self.y:
+            return np.empty(0), np.empty(0)
+        x, y = downsample_line(np.concatenate(self.x), np.concatenate(self.y), self.max_points)
+        # Reduced from a long series: use a date axis even if few points remain
+        if self.seen > MAX_CATEGORY_POINTS:
+            x = as_plot_x(x)
+        return x, y
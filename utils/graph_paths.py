@@ -0,0 +1,123 @@
+"""
+Shortest-path lengths for many (source, target) pairs at once.
+
+Pairs are grouped by source so each distinct source is searched once
+(one BFS) and its distances are reused for every target asked for from
+it. The same search gives the source's eccentricity within its component
+and how many nodes it can reach.
+"""
+from typing import Callable, Optional
+
+# Upper bound on pairs accepted in one request
+MAX_PAIRS = 1000
+
+PAIR_SEPARATORS = (",", ";", "\n")
+
+def parse_pairs(text: str) -> list[tuple[str, str]]:
+    """
+    Parse "Alice:Eve, Bob->Dan" (pairs separated by commas, semicolons or
+    newlines; source and target by ":" or "->") into a list of pairs.
+    Raises ValueError on malformed input.
+    """
+    for sep in PAIR_SEPARATORS[1:]:
+        text = text.replace(sep, PAIR_SEPARATORS[0])
+    pairs = []
+    for item in text.split(PAIR_SEPARATORS[0]):
+        item = item.strip()
+        if not item:
+            continue
+        source, arrow, target = item.partition("->")
+        if not arrow:
+            source, arrow, target = item.partition(":")
+        source, target = source.strip(), target.strip()
+        if not arrow or not source or not target:
+            raise ValueError(f"Invalid pair {item!r}: expected 'source:target'")
+        pairs.append((source, target))
+    if len(pairs) > MAX_PAIRS:
+        raise ValueError(f"Too many pairs: {len(pairs)} (max {MAX_PAIRS})")
+    return pairs
+
+def group_by_source(pairs) -> dict[str, list[str]]:
+    """Distinct targets per source, both in first-seen order."""
+    groups = {}
+    for source, target in pairs:
+        targets = groups.setdefault(source, [])
+        if target not in targets:
+            targets.append(target)
+    return groups
+
+def shortest_path_report(pairs, single_source: Callable) -> tuple[list[dict], dict]:
+    """
+    single_source(label) runs one BFS and returns None if the node doesn't
+    exist, else (distance_to, eccentricity, reachable) where distance_to(label)
+    gives the hop count or None if unreachable.
+
+    Returns (per-pair lengths in request order, per-source stats).
+    """
+    lengths = {}
+    stats = {}
+    for source, targets in group_by_source(pairs).items():
+        result = single_source(source)
+        if result is None:
+            stats[source] = {"found": False, "eccentricity": None, "reachable": 0}
+            for target in targets:
+                lengths[(source, target)] = None
+            continue
+        distance_to, eccentricity, reachable = result
+        stats[source] = {"found": True, "eccentricity": eccentricity, "reachable": reachable}
+        for target in targets:
+            lengths[(source, target)] = distance_to(target)
+
+    paths = [
+        {"source": source, "target": target, "length": lengths[(source, target)]}
+        for source, target in pairs
+    ]
+    return paths, stats
+
+def _label_lookup(nodes, labels=None) -> dict:
+    """Map str(label) -> node; the first node wins if two labels print the same (1 and "1")."""
+    lookup = {}
+    for node, label in zip(nodes, labels if labels is not None else nodes):
+        lookup.setdefault(str(label), node)
+    return lookup
+
+def nx_single_source(G) -> Callable[[str], Optional[tuple]]:
+    """single_source callback for a networkx graph (node labels matched as strings)."""
+    # Graph libraries are imported here so main can use parse_pairs without them
+    import networkx as nx
+
+    nodes = _label_lookup(G)
+
+    def run(label: str):
+        node = nodes.get(label)
+        if node is None:
+            return None
+        distances = nx.single_source_shortest_path_length(G, node)
+        distance_to = lambda target: distances.get(nodes.get(target))
+        return distance_to, max(distances.values()), len(distances) - 1
+
+    return run
+
+def sparse_single_source(adjacency, labels) -> Callable[[str], Optional[tuple]]:
+    """single_source callback for an undirected scipy.sparse adjacency matrix."""
+    import numpy as np
+    from scipy.sparse import csgraph
+
+    positions = _label_lookup(range(len(labels)), labels)
+
+    def run(label: str):
+        source = positions.get(label)
+        if source is None:
+            return None
+        distances = csgraph.shortest_path(adjacency, directed=False, unweighted=True, indices=source)
+        reached = np.isfinite(distances)
+
+        def distance_to(target: str):
+            position = positions.get(target)
+            if position is None or not reached[position]:
+                return None
+            return int(distances[position])
+
+        return distance_to, int(distances[reached].max()), int(reached.sum()) - 1
+
+    return run
@@ -0,0 +1,188 @@
+"""
+Per-request stage timings and latency histograms.
+
+Code marks a stage with `with timed("parse"):` (or `@timed("compute")`).
+Stages nest and are recorded as exclusive time, so a "compute" stage that
+reads its CSV under "parse" doesn't count the read twice. Timings go to
+the request that is active in the current context (see request_timer);
+outside of one, timed() is a no-op.
+
+Analysis workers collect their own stages (collect_stages) and send them
+back with the result, where they are merged into the web request. Each
+finished request adds its total and per-stage times to the histograms
+rendered by render_prometheus() and, at DEBUG, logs one "timing" line.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ContextDecorator, contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# Upper bounds in seconds (Prometheus client defaults, plus 30/60/120 for
+# chart-heavy uploads)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+logger = logging.getLogger("timing")
+
+class Histogram:
+    """Cumulative-bucket latency histogram; observe() is thread-safe."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[slot] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self) -> tuple[list, int, float]:
+        """(cumulative bucket counts, count, sum) read consistently."""
+        with self._lock:
+            counts, count, total = list(self.counts), self.count, self.sum
+        cumulative, running = [], 0
+        for c in counts:
+            running += c
+            cumulative.append(running)
+        return cumulative, count, total
+
+# name -> (help text, {label tuple: Histogram})
+_histograms = {
+    "request_duration_seconds": ("End-to-end request latency by endpoint.", {}),
+    "stage_duration_seconds": ("Exclusive time spent in each request stage.", {}),
+}
+_registry_lock = threading.Lock()
+
+def observe(name: str, value: float, **labels) -> None:
+    help_text, series = _histograms[name]
+    key = tuple(sorted(labels.items()))
+    histogram = series.get(key)
+    if histogram is None:
+        with _registry_lock:
+            histogram = series.setdefault(key, Histogram())
+    histogram.observe(value)
+
+def _format_labels(pairs) -> str:
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pairs
+    )
+    return "{" + body + "}"
+
+def render_prometheus() -> str:
+    """All histograms in the Prometheus text exposition format (0.0.4)."""
+    lines = []
+    for name, (help_text, series) in _histograms.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        with _registry_lock:
+            items = sorted(series.items())
+        for key, histogram in items:
+            cumulative, count, total = histogram.snapshot()
+            bounds = [repr(b) for b in histogram.buckets] + ["+Inf"]
+            for bound, c in zip(bounds, cumulative):
+                lines.append(f"{name}_bucket{_format_labels(key + (('le', bound),))} {c}")
+            lines.append(f"{name}_sum{_format_labels(key)} {total}")
+            lines.append(f"{name}_count{_format_labels(key)} {count}")
+    return "\n".join(lines) + "\n"
+
+class RequestTimer:
+    """Stage timings of one request (or worker job)."""
+
+    def __init__(self, endpoint: str = ""):
+        self.endpoint = endpoint
+        self.status = None  # set by the caller, only used in the log line
+        self.stages = {}
+        self.started = time.perf_counter()
+        # Open stages: [name, start, time spent in nested stages]
+        self._open = []
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def merge(self, stages: dict) -> None:
+        for stage, seconds in stages.items():
+            self.add(stage, seconds)
+
+    def finish(self) -> float:
+        """Record the request in the histograms and log its timing line."""
+        total = time.perf_counter() - self.started
+        observe("request_duration_seconds", total, endpoint=self.endpoint)
+        for stage, seconds in self.stages.items():
+            observe("stage_duration_seconds", seconds, endpoint=self.endpoint, stage=stage)
+        # Debug only: /metrics has the same numbers without a log write per request
+        if logger.isEnabledFor(logging.DEBUG):
+            stages = " ".join(f"{stage}_ms={seconds * 1000:.1f}" for stage, seconds in self.stages.items())
+            logger.debug("timing endpoint=%s status=%s total_ms=%.1f %s", self.endpoint, self.status, total * 1000, stages)
+        return total
+
+# Request timer of the current async context (web process)
+_current = ContextVar("request_timer", default=None)
+# Timer of the current worker job; executor threads don't inherit contextvars
+_local = threading.local()
+
+def current_timer() -> Optional[RequestTimer]:
+    return getattr(_local, "timer", None) or _current.get()
+
+@contextmanager
+def request_timer(endpoint: str):
+    """Time one request: stages inside are collected, then finish() is called."""
+    timer = RequestTimer(endpoint)
+    token = _current.set(timer)
+    try:
+        yield timer
+    finally:
+        _current.reset(token)
+        timer.finish()
+
+@contextmanager
+def collect_stages():
+    """Collect the stages timed in this thread (e.g. one analysis job); yields the dict."""
+    previous = getattr(_local, "timer", None)
+    timer = _local.timer = RequestTimer()
+    try:
+        yield timer.stages
+    finally:
+        _local.timer = previous
+
+class timed(ContextDecorator):
+    """Context manager / decorator timing a stage of the current request."""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        timer = current_timer()
+        if timer is not None:
+            timer._open.append([self.stage, time.perf_counter(), 0.0])
+        return self
+
+    def __exit__(self, *exc):
+        timer = current_timer()
+        if timer is not None and timer._open:
+            stage, start, nested = timer._open.pop()
+            elapsed = time.perf_counter() - start
+            timer.add(stage, elapsed - nested)
+            if timer._open:
+                timer._open[-1][2] += elapsed
+        return False
+
+def timed_iter(iterable, stage: str):
+    """Iterate, timing only the production of each item (e.g. chunked CSV reads) as stage."""
+    iterator = iter(iterable)
+    while True:
+        with timed(stage):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
@@ -0,0 +1,124 @@
+"""
+Content-addressed cache of rendered /analyze responses.
+
+Keys are the handler name plus a hash of the uploaded bytes, values are
+the encoded JSON response body (charts included), so a repeat upload is
+answered without parsing, analysing or re-encoding anything. The memory
+tier is a byte-bounded LRU; the optional disk tier keeps one file per key
+and evicts the least recently used files when over its own budget.
+"""
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from config import RESULT_CACHE_DIR, RESULT_CACHE_DISK_MAX_BYTES, RESULT_CACHE_MAX_BYTES
+
+# Bump when analyzer output changes so stale disk entries are never served
+CACHE_VERSION = 2
+
+def new_hasher():
+    """Incremental hasher used for upload contents."""
+    return hashlib.blake2b(digest_size=20)
+
+def cache_key(handler_name: str, digest: str, options: str = "") -> str:
+    """options: canonical form of any request parameters that change the result."""
+    key = f"v{CACHE_VERSION}-{handler_name}-{digest}"
+    if options:
+        key += "-" + hashlib.blake2b(options.encode("utf-8"), digest_size=8).hexdigest()
+    return key
+
+class ResultCache:
+    def __init__(self, max_bytes: int, disk_dir: str = "", disk_max_bytes: int = 0):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+                return body
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                body = f.read()
+            os.utime(path)  # mark as recently used for disk eviction
+        except OSError:
+            return None
+        self._put_memory(key, body)
+        return body
+
+    def put(self, key: str, body: bytes) -> None:
+        self._put_memory(key, body)
+        if self.disk_dir:
+            try:
+                self._put_disk(key, body)
+            except OSError as e:
+                logging.warning(f"Could not write result cache entry {key}: {e}")
+
+    def _put_memory(self, key: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def _put_disk(self, key: str, body: bytes) -> None:
+        path = self._disk_path(key)
+        tmp_path = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+        self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        entries = []
+        total = 0
+        with os.scandir(self.disk_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Shared cache instance, or None when RESULT_CACHE_MAX_BYTES is 0."""
+    global _cache
+    if RESULT_CACHE_MAX_BYTES <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache(RESULT_CACHE_MAX_BYTES, RESULT_CACHE_DIR, RESULT_CACHE_DISK_MAX_BYTES)
+        return _cache
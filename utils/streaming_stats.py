@@ -0,0 +1,266 @@
+"""
+Running statistics for chunked CSV analysis.
+
+Each accumulator takes whole numpy chunks (NaNs are skipped, as pandas
+does), so memory stays bounded by the accumulator state rather than the
+number of rows. The moment and quantile accumulators can also be merged
+with another of the same kind.
+"""
+import math
+import os
+from typing import Optional
+
+import numpy as np
+
+def source_size(source) -> Optional[int]:
+    """Size in bytes of a path or seekable file object, None if unknown."""
+    try:
+        if isinstance(source, (str, os.PathLike)):
+            return os.path.getsize(source)
+        position = source.tell()
+        size = source.seek(0, os.SEEK_END)
+        source.seek(position)
+        return size
+    except (OSError, AttributeError, ValueError):
+        return None
+
+class RunningCovariance:
+    """
+    Count, means, variances and covariance of (x, y) pairs, combined chunk by
+    chunk with the pairwise update of Chan et al. so large sums don't lose
+    precision. Pairs where either value is NaN are dropped, like Series.corr.
+    """
+
+    def __init__(self):
+        self.n = 0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.m2_x = 0.0
+        self.m2_y = 0.0
+        self.c_xy = 0.0
+
+    def update(self, x, y) -> None:
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        valid = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[valid], y[valid]
+        if len(x) == 0:
+            return
+        other = RunningCovariance()
+        other.n = len(x)
+        other.mean_x = float(x.mean())
+        other.mean_y = float(y.mean())
+        dx, dy = x - other.mean_x, y - other.mean_y
+        other.m2_x = float(dx @ dx)
+        other.m2_y = float(dy @ dy)
+        other.c_xy = float(dx @ dy)
+        self.merge(other)
+
+    def merge(self, other: "RunningCovariance") -> None:
+        if other.n == 0:
+            return
+        n = self.n + other.n
+        dx = other.mean_x - self.mean_x
+        dy = other.mean_y - self.mean_y
+        factor = self.n * other.n / n
+        self.m2_x += other.m2_x + dx * dx * factor
+        self.m2_y += other.m2_y + dy * dy * factor
+        self.c_xy += other.c_xy + dx * dy * factor
+        self.mean_x += dx * other.n / n
+        self.mean_y += dy * other.n / n
+        self.n = n
+
+    def correlation(self) -> float:
+        """Pearson correlation, NaN when undefined (fewer than 2 pairs or zero variance)."""
+        if self.n < 2 or self.m2_x == 0 or self.m2_y == 0:
+            return float("nan")
+        return self.c_xy / math.sqrt(self.m2_x * self.m2_y)
+
+class QuantileSketch:
+    """
+    Log-bucketed histogram (DDSketch) with quantiles accurate to within
+    relative_accuracy of the true value. Size depends on the range of
+    magnitudes seen, not on the number of values, and two sketches with the
+    same accuracy merge by adding bucket counts.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.005):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = {}  # bucket index -> count
+        self.negative = {}  # bucket index of |value| -> count
+        self.zeros = 0
+        self.count = 0
+
+    def _add(self, store: dict, magnitudes: np.ndarray) -> None:
+        if len(magnitudes) == 0:
+            return
+        buckets = np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+        keys, counts = np.unique(buckets, return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + count
+
+    def update(self, values) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self._add(self.positive, values[values > 0])
+        self._add(self.negative, -values[values < 0])
+        self.zeros += int(np.count_nonzero(values == 0))
+        self.count += len(values)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def _bucket_value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def _value_at(self, rank: int) -> float:
+        # Walk buckets in ascending value order: negatives (largest magnitude first), zeros, positives
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if rank < seen:
+                return -self._bucket_value(key)
+        seen += self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if rank < seen:
+                return self._bucket_value(key)
+        raise IndexError(rank)
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile, interpolating between neighbouring ranks like pandas; NaN if empty."""
+        if self.count == 0:
+            return float("nan")
+        position = q * (self.count - 1)
+        low = math.floor(position)
+        low_value = self._value_at(low)
+        if position == low:
+            return low_value
+        return low_value + (self._value_at(low + 1) - low_value) * (position - low)
+
+class RunningMoments:
+    """Welford count, mean and variance plus min/max of a stream of values (NaNs skipped)."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = float("nan")
+        self.max = float("nan")
+
+    def update(self, values) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        other = RunningMoments()
+        other.n = len(values)
+        other.mean = float(values.mean())
+        deviations = values - other.mean
+        other.m2 = float(deviations @ deviations)
+        other.min = float(values.min())
+        other.max = float(values.max())
+        self.merge(other)
+
+    def merge(self, other: "RunningMoments") -> None:
+        if other.n == 0:
+            return
+        if self.n == 0:
+            self.n, self.mean, self.m2, self.min, self.max = other.n, other.mean, other.m2, other.min, other.max
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.mean += delta * other.n / n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.n = n
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (ddof=1, as pandas), NaN for fewer than 2 values."""
+        return self.m2 / (self.n - 1) if self.n > 1 else float("nan")
+
+class FixedBinHistogram:
+    """
+    Exact counts in a fixed number of equal-width bins whose range doubles
+    (merging neighbouring bins) whenever a value falls outside it, so the
+    data range need not be known up front. rebin() turns the fine bins into
+    a coarse histogram over the observed [min, max], accurate to one fine bin.
+    Up to exact_limit values are simply kept, so small inputs bin exactly.
+    """
+
+    def __init__(self, bins: int = 4096, exact_limit: int = 65536):
+        if bins < 2 or bins % 2:
+            raise ValueError("bins must be an even number >= 2")
+        self.bins = bins
+        self.exact_limit = exact_limit
+        self._exact = []  # raw values until exact_limit is passed, then None
+        self._exact_count = 0
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.lo = None
+        self.width = None
+        self.min = float("nan")
+        self.max = float("nan")
+
+    def _grow_right(self) -> None:
+        half = self.counts.reshape(-1, 2).sum(axis=1)
+        self.counts = np.concatenate([half, np.zeros_like(half)])
+        self.width *= 2
+
+    def _grow_left(self) -> None:
+        half = self.counts.reshape(-1, 2).sum(axis=1)
+        self.counts = np.concatenate([np.zeros_like(half), half])
+        self.lo -= self.bins * self.width
+        self.width *= 2
+
+    def update(self, values) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        if self._exact is not None:
+            self._exact_count += len(values)
+            if self._exact_count <= self.exact_limit:
+                self._exact.append(values)
+                return
+            # Too many to keep: bin everything seen so far from here on
+            values = np.concatenate(self._exact + [values])
+            self._exact = None
+        self._bin(values)
+
+    def _bin(self, values: np.ndarray) -> None:
+        low, high = float(values.min()), float(values.max())
+        if self.lo is None:
+            self.lo = low
+            self.width = (high - low) / self.bins or max(abs(low), 1.0) * 1e-9
+            self.min, self.max = low, high
+        self.min, self.max = min(self.min, low), max(self.max, high)
+        while high >= self.lo + self.bins * self.width:
+            self._grow_right()
+        while low < self.lo:
+            self._grow_left()
+        counts, _ = np.histogram(values, bins=self.bins, range=(self.lo, self.lo + self.bins * self.width))
+        self.counts += counts
+
+    def rebin(self, bins: int) -> tuple[np.ndarray, np.ndarray]:
+        """(counts, edges) over [min, max] like np.histogram(values, bins)."""
+        if self._exact is not None:
+            return np.histogram(np.concatenate(self._exact + [np.empty(0)]), bins=bins)
+        low, high = self.min, self.max
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+        edges = np.linspace(low, high, bins + 1)
+        centers = self.lo + (np.arange(self.bins) + 0.5) * self.width
+        counts, _ = np.histogram(np.clip(centers, low, high), bins=edges, weights=self.counts)
+        return counts.astype(np.int64), edges
@@ -0,0 +1,147 @@
+"""
+GET routes for the Wikipedia handlers, with ETags and conditional GET.
+
+Each handler(request) in handlers/ is mounted at /<name>. A response only
+depends on the dataset version and the query parameters, so its ETag is a
+hash of exactly those. A request whose If-None-Match carries the current
+ETag is answered 304 before the handler runs. Encoded bodies are also kept
+in a byte-bounded LRU keyed by ETag, so repeat requests from clients
+without a cached copy skip the handler as well. A hot reload changes the
+dataset version and with it every ETag.
+
+/random is the exception: it is mounted uncached (Cache-Control: no-store).
+"""
+import hashlib
+import json
+import threading
+from typing import Optional
+
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
+
+from config import WIKIPEDIA_CACHE_MAX_AGE, WIKIPEDIA_RESPONSE_CACHE_BYTES
+from handlers import (
+    categories, category_articles, images, links, random, related, search, stats, summary,
+    top_categories,
+)
+from utils.metrics import request_timer, timed
+from utils.result_cache import ResultCache
+from utils.wikipedia_loader import get_dataset
+
+# Route name -> handler module; each is mounted at GET /<name>
+CACHEABLE_ROUTES = {
+    "search": search,
+    "summary": summary,
+    "links": links,
+    "images": images,
+    "categories": categories,
+    "stats": stats,
+    "related": related,
+    "top_categories": top_categories,
+    "category_articles": category_articles,
+}
+UNCACHED_ROUTES = {
+    "random": random,
+}
+
+router = APIRouter()
+
+_responses = None
+_responses_lock = threading.Lock()
+
+def _response_cache() -> Optional[ResultCache]:
+    global _responses
+    if WIKIPEDIA_RESPONSE_CACHE_BYTES <= 0:
+        return None
+    with _responses_lock:
+        if _responses is None:
+            _responses = ResultCache(WIKIPEDIA_RESPONSE_CACHE_BYTES)
+        return _responses
+
+def make_etag(version: str, name: str, params) -> str:
+    """Strong ETag from the dataset version, route and (order-independent) query parameters."""
+    hasher = hashlib.blake2b(digest_size=12)
+    hasher.update(f"{version}\0{name}".encode("utf-8"))
+    for key, value in sorted(params):
+        hasher.update(f"\0{key}={value}".encode("utf-8"))
+    return f'"{hasher.hexdigest()}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 requires for this header)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def _encode(result) -> bytes:
+    # Same encoding as JSONResponse
+    return json.dumps(result, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def _cache_headers(etag: str, hit: Optional[bool] = None) -> dict:
+    if WIKIPEDIA_CACHE_MAX_AGE > 0:
+        cache_control = f"public, max-age={WIKIPEDIA_CACHE_MAX_AGE}"
+    else:
+        cache_control = "no-cache"  # may be stored, but revalidated every time
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if hit is not None:
+        headers["X-Cache"] = "HIT" if hit else "MISS"
+    return headers
+
+def _run_handler(module, request: Request):
+    with timed("handle"):
+        return module.handler({"params": dict(request.query_params)})
+
+def _serve_cached(name: str, module, request: Request) -> Response:
+    with timed("etag"):
+        dataset = get_dataset()
+        etag = None
+        if dataset.digest is not None:
+            etag = make_etag(dataset.version, name, request.query_params.multi_items())
+    if etag is not None:
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=_cache_headers(etag))
+        cache = _response_cache()
+        body = cache.get(etag) if cache is not None else None
+        if body is not None:
+            return Response(content=body, media_type="application/json", headers=_cache_headers(etag, hit=True))
+
+    result = _run_handler(module, request)
+    with timed("encode"):
+        body = _encode(result)
+    # A reload that landed while the handler ran makes the ETag unreliable
+    if etag is None or get_dataset() is not dataset:
+        return Response(content=body, media_type="application/json", headers={"Cache-Control": "no-cache"})
+    cache = _response_cache()
+    if cache is not None:
+        cache.put(etag, body)
+    return Response(content=body, media_type="application/json", headers=_cache_headers(etag, hit=False))
+
+def _mount(name: str, module, cacheable: bool) -> None:
+    def endpoint(request: Request):
+        with request_timer(name) as timer:
+            if cacheable:
+                response = _serve_cached(name, module, request)
+            else:
+                result = _run_handler(module, request)
+                with timed("encode"):
+                    body = _encode(result)
+                response = Response(content=body, media_type="application/json", headers={"Cache-Control": "no-store"})
+            timer.status = response.status_code
+            return response
+
+    # Sync endpoint: FastAPI runs it in the threadpool (the first call may load the dataset)
+    endpoint.__name__ = f"wikipedia_{name}"
+    endpoint.__doc__ = (module.handler.__doc__ or "").strip()
+    router.add_api_route(f"/{name}", endpoint, methods=["GET"], name=name)
+
+for _name, _module in CACHEABLE_ROUTES.items():
+    _mount(_name, _module, cacheable=True)
+for _name, _module in UNCACHED_ROUTES.items():
+    _mount(_name, _module, cacheable=False)
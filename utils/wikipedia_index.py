@@ -0,0 +1,176 @@
+import heapq
+from array import array
+from collections import Counter
+
+from utils.wikipedia_store import ID_TYPECODE
+
+# Keys that may carry alternate titles (redirects, aliases) for an article
+ALIAS_KEYS = ("redirects", "aliases")
+
+def normalize_title(title):
+    """Normalize a title for lookups (case-insensitive, trims spaces)."""
+    if not isinstance(title, str):
+        return ""
+    return title.strip().lower()
+
+def make_preview(summary):
+    """Short summary preview used in listings (first ~150 chars)."""
+    if not isinstance(summary, str) or not summary:
+        return ""
+    return summary[:150].rsplit(" ", 1)[0] + "..."
+
+def build_title_index(data):
+    """
+    Map normalized titles to article ids (positions in data).
+    Real titles take precedence over redirects/aliases, and the first
+    article wins on duplicates (same as the old linear scan).
+    """
+    index = {}
+    for article_id, article in enumerate(data):
+        key = normalize_title(article.get("title", ""))
+        if key:
+            index.setdefault(key, article_id)
+
+    for article_id, article in enumerate(data):
+        for alias_key in ALIAS_KEYS:
+            aliases = article.get(alias_key, [])
+            if not isinstance(aliases, list):
+                continue
+            for alias in aliases:
+                key = normalize_title(alias)
+                if key:
+                    index.setdefault(key, article_id)
+    return index
+
+def build_previews(data):
+    """Summary preview per article id."""
+    return [make_preview(article.get("summary", "")) for article in data]
+
+class LinkGraph:
+    """
+    Article link graph over article ids:
+    forward links resolved through the title index and reverse links
+    (who links here).
+    """
+
+    def __init__(self, data, title_index):
+        # Compact stores keep links as ids into a shared string table, so each
+        # distinct link string is resolved once instead of once per occurrence
+        strings = getattr(data, "strings", None)
+        string_targets = None
+        if strings is not None:
+            string_targets = [title_index.get(normalize_title(s), -1) for s in strings]
+
+        self.outgoing = []
+        incoming = [[] for _ in data]
+        for source, article in enumerate(data):
+            link_ids = getattr(article, "links", None)
+            if string_targets is not None and link_ids is not None:
+                targets = [string_targets[i] for i in link_ids if string_targets[i] >= 0]
+            else:
+                targets = []
+                links = article.get("links", [])
+                if isinstance(links, list):
+                    for link in links:
+                        target = title_index.get(normalize_title(link))
+                        if target is not None:
+                            targets.append(target)
+            self.outgoing.append(array(ID_TYPECODE, targets))
+            for target in dict.fromkeys(targets):
+                incoming[target].append(source)
+        self.incoming = [array(ID_TYPECODE, sources) for sources in incoming]
+
+    def second_degree(self, article_id, limit):
+        """
+        Articles two hops away via forward links, excluding the article itself
+        and its direct links. Returns up to limit (article id, via id) pairs.
+        """
+        direct = set(self.outgoing[article_id])
+        seen = direct | {article_id}
+        found = []
+        for via in dict.fromkeys(self.outgoing[article_id]):
+            for target in self.outgoing[via]:
+                if target in seen:
+                    continue
+                seen.add(target)
+                found.append((target, via))
+                if len(found) >= limit:
+                    return found
+        return found
+
+def build_link_graph(data, title_index):
+    return LinkGraph(data, title_index)
+
+def build_aggregates(data):
+    """
+    Dataset-wide aggregates behind /stats and /top_categories:
+    totals, a category frequency table and the categories ordered by count.
+    """
+    category_counts = Counter()
+    total_links = 0
+    total_images = 0
+    for article in data:
+        cats = article.get("categories", [])
+        if isinstance(cats, list):
+            category_counts.update(cats)
+        links = article.get("links", [])
+        if isinstance(links, list):
+            total_links += len(links)
+        images = article.get("images", [])
+        if isinstance(images, list):
+            total_images += len(images)
+
+    return {
+        "total_articles": len(data),
+        "total_links": total_links,
+        "total_images": total_images,
+        "category_counts": category_counts,
+        # Same order as Counter.most_common(), so top-N is a slice
+        "top_categories": category_counts.most_common(),
+    }
+
+def build_category_postings(data):
+    """
+    Map normalized category names to sorted lists of article ids.
+    Ids are appended in dataset order, so every postings list is sorted.
+    """
+    postings = {}
+    for article_id, article in enumerate(data):
+        cats = article.get("categories", [])
+        if not isinstance(cats, list):
+            continue
+        for key in dict.fromkeys(normalize_title(cat) for cat in cats):
+            if key:
+                postings.setdefault(key, []).append(article_id)
+    return postings
+
+def intersect_sorted(lists):
+    """Intersection of sorted id lists, merging from the shortest list up."""
+    if not lists:
+        return []
+    lists = sorted(lists, key=len)
+    result = lists[0]
+    for other in lists[1:]:
+        merged = []
+        i = j = 0
+        while i < len(result) and j < len(other):
+            if result[i] == other[j]:
+                merged.append(result[i])
+                i += 1
+                j += 1
+            elif result[i] < other[j]:
+                i += 1
+            else:
+                j += 1
+        result = merged
+        if not result:
+            break
+    return list(result)
+
+def union_sorted(lists):
+    """Union of sorted id lists as one sorted, duplicate-free list."""
+    result = []
+    for article_id in heapq.merge(*lists):
+        if not result or result[-1] != article_id:
+            result.append(article_id)
+    return result
@@ -1,31 +1,247 @@
 import json
-from config import DATA_PATH
+import os
+import threading
+import time
+from config import (
+    DATA_LOAD_WORKERS, DATA_PATH, RELOAD_INTERVAL, SNAPSHOT_ENABLED, SNAPSHOT_KEY, SNAPSHOT_PATH,
+)
+from utils.wikipedia_index import (
+    build_aggregates, build_category_postings, build_link_graph, build_previews,
+    build_title_index, normalize_title,
+)
+from utils.metrics import timed
+from utils.wikipedia_search import build_text_search_index, build_title_search_index
+from utils.wikipedia_reader import iter_articles
+from utils.wikipedia_snapshot import load_snapshot, source_hash, write_snapshot
+from utils.wikipedia_store import ArticleStoreBuilder
 
-# Simple in-memory cache
-_cached_data = None
+class Dataset:
+    """
+    One loaded version of the dataset: the compact article store plus the
+    indexes derived from it. Instances are never mutated after they are
+    published, so a request that grabs one sees a consistent store and
+    indexes even if a reload swaps in a newer version meanwhile.
 
-def load_data():
-    global _cached_data
-    if _cached_data is not None:
-        return _cached_data
+    indexes:
+      title         normalized title (and redirect/alias) -> article id
+      title_search  n-gram/prefix structures behind /search
+      text_search   BM25 inverted index behind /search?mode=fulltext
+      aggregates    category counts and totals behind /stats and /top_categories
+      previews      summary preview per article id
+      link_graph    resolved forward/backward links behind /related
+      categories    normalized category -> sorted article ids
+    """
+
+    __slots__ = ("articles", "indexes", "digest", "source_stat", "loaded_at")
+
+    def __init__(self, articles, indexes, digest, source_stat):
+        self.articles = articles
+        self.indexes = indexes
+        self.digest = digest
+        self.source_stat = source_stat
+        self.loaded_at = time.time()
+
+    @property
+    def version(self):
+        """Short content hash of the source file this dataset was built from."""
+        return self.digest.hex()[:12] if self.digest else "unknown"
+
+    def find_article_id(self, title):
+        if not title:
+            return None
+        return self.indexes["title"].get(normalize_title(title))
+
+    def find_article(self, title):
+        article_id = self.find_article_id(title)
+        if article_id is None:
+            return None
+        return self.articles[article_id]
+
+# Currently published Dataset; replaced by a single reference assignment
+_current = None
+# Serializes the first load and background rebuilds
+_load_lock = threading.Lock()
+_watcher = None
+# Source stat of the last failed reload, so a broken file is retried only once it changes
+_failed_stat = None
+
+def _build_indexes(data):
+    title_index = build_title_index(data)
+    previews = build_previews(data)
+    return {
+        "title": title_index,
+        "title_search": build_title_search_index(data, previews),
+        "text_search": build_text_search_index(data),
+        "aggregates": build_aggregates(data),
+        "previews": previews,
+        "link_graph": build_link_graph(data, title_index),
+        "categories": build_category_postings(data),
+    }
+
+def clear_cache():
+    """Drop the cached dataset and everything derived from it (rebuilt on next use)."""
+    global _current
+    _current = None
+
+def _read_store(path, strict=False):
+    """
+    Stream articles from disk straight into a compact store, one record at a
+    time, so the raw text and full JSON object tree are never held at once.
+    With strict=True read errors propagate instead of yielding an empty store.
+    """
+    builder = ArticleStoreBuilder()
     try:
-        with open(DATA_PATH, "r", encoding="utf-8") as f:
-            _cached_data = json.load(f)
+        for raw in iter_articles(path, workers=DATA_LOAD_WORKERS):
+            builder.add(raw)
     except FileNotFoundError:
-        print(f"[ERROR] Data file not found at {DATA_PATH}")
-        _cached_data = []
+        if strict:
+            raise
+        print(f"[ERROR] Data file not found at {path}")
+        builder = ArticleStoreBuilder()
     except json.JSONDecodeError:
-        print(f"[ERROR] Invalid JSON format in {DATA_PATH}")
-        _cached_data = []
-    return _cached_data
+        if strict:
+            raise
+        print(f"[ERROR] Invalid JSON format in {path}")
+        builder = ArticleStoreBuilder()
+    return builder.finish()
 
-def find_article(title):
-    """Finds an article by title (case-insensitive, trims spaces)."""
-    if not title:
+def build_dataset(path, strict=False):
+    """Parse the dataset at path and build all indexes; returns (store, indexes)."""
+    data = _read_store(path, strict)
+    return data, _build_indexes(data)
+
+def _source_stat(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
         return None
-    data = load_data()
-    title = title.strip().lower()
-    for article in data:
-        if article.get("title", "").strip().lower() == title:
-            return article
-    return None
+    return (stat.st_size, stat.st_mtime_ns)
+
+def _open_dataset(path, strict=False):
+    """
+    Load from a matching binary snapshot, or parse the source and (re)write
+    the snapshot. Returns a new Dataset.
+    """
+    source_stat = _source_stat(path)
+    if SNAPSHOT_ENABLED:
+        snapshot = load_snapshot(SNAPSHOT_PATH, path, SNAPSHOT_KEY)
+        if snapshot is not None:
+            data, indexes, digest = snapshot
+            return Dataset(data, indexes, digest, source_stat)
+    try:
+        digest = source_hash(path)
+    except OSError:
+        if strict:
+            raise
+        digest = None
+    data, indexes = build_dataset(path, strict)
+    if SNAPSHOT_ENABLED and data and digest is not None:
+        try:
+            write_snapshot(SNAPSHOT_PATH, path, data, indexes, SNAPSHOT_KEY, digest)
+        except OSError as e:
+            print(f"[WARN] Could not write snapshot {SNAPSHOT_PATH}: {e}")
+    return Dataset(data, indexes, digest, source_stat)
+
+def get_dataset():
+    """Return the current Dataset, loading it on first use."""
+    global _current
+    dataset = _current
+    if dataset is not None:
+        return dataset
+    # Only the first request pays for (and is timed with) the load
+    with _load_lock, timed("dataset_load"):
+        if _current is None:
+            _current = _open_dataset(DATA_PATH)
+            _start_watcher()
+        return _current
+
+def reload_if_changed():
+    """
+    Rebuild the dataset if the data file changed (size/mtime, confirmed by
+    content hash) and atomically swap it in. Readers keep using the old
+    version until the new one is fully built. Returns True if swapped.
+    """
+    global _current, _failed_stat
+    current = _current
+    if current is None:
+        return False
+    source_stat = _source_stat(DATA_PATH)
+    if source_stat is None or source_stat in (current.source_stat, _failed_stat):
+        return False
+    with _load_lock:
+        current = _current
+        try:
+            digest = source_hash(DATA_PATH)
+        except OSError:
+            return False
+        if digest == current.digest:
+            # Touched but unchanged: just remember the new stat
+            _current = Dataset(current.articles, current.indexes, digest, source_stat)
+            _current.loaded_at = current.loaded_at
+            return False
+        try:
+            dataset = _open_dataset(DATA_PATH, strict=True)
+        except (OSError, json.JSONDecodeError) as e:
+            # Most likely a half-written file; retry on the next poll
+            print(f"[WARN] Keeping dataset {current.version}, reload failed: {e}")
+            _failed_stat = source_stat
+            return False
+        _current = dataset
+        print(f"[INFO] Reloaded dataset {current.version} -> {dataset.version}")
+        return True
+
+def _watch(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            reload_if_changed()
+        except Exception as e:
+            print(f"[ERROR] Dataset reload check failed: {e}")
+
+def _start_watcher():
+    global _watcher
+    if RELOAD_INTERVAL <= 0 or _watcher is not None:
+        return
+    _watcher = threading.Thread(
+        target=_watch, args=(RELOAD_INTERVAL,), name="wikipedia-reload", daemon=True
+    )
+    _watcher.start()
+
+def load_data():
+    return get_dataset().articles
+
+def get_title_index():
+    """Return the normalized-title -> article id index for the loaded dataset."""
+    return get_dataset().indexes["title"]
+
+def get_title_search_index():
+    """Return the title search index for the loaded dataset."""
+    return get_dataset().indexes["title_search"]
+
+def get_text_search_index():
+    """Return the full-text (BM25) index for the loaded dataset."""
+    return get_dataset().indexes["text_search"]
+
+def get_aggregates():
+    """Return precomputed dataset aggregates (totals, category counts, top categories)."""
+    return get_dataset().indexes["aggregates"]
+
+def get_link_graph():
+    """Return the resolved link graph for the loaded dataset."""
+    return get_dataset().indexes["link_graph"]
+
+def get_previews():
+    """Return the summary preview list (indexed by article id)."""
+    return get_dataset().indexes["previews"]
+
+def get_category_postings():
+    """Return the normalized category -> sorted article ids index."""
+    return get_dataset().indexes["categories"]
+
+def find_article_id(title):
+    """Finds an article id by title or redirect/alias (case-insensitive, trims spaces)."""
+    return get_dataset().find_article_id(title)
+
+def find_article(title):
+    """Finds an article by title or redirect/alias (case-insensitive, trims spaces)."""
+    return get_dataset().find_article(title)
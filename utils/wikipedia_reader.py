@@ -0,0 +1,147 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Characters skipped between array elements
+_WHITESPACE = " \t\n\r"
+
+NDJSON_EXTENSIONS = (".jsonl", ".ndjson")
+
+def is_ndjson(path):
+    """Newline-delimited datasets are recognised by extension."""
+    return path.lower().endswith(NDJSON_EXTENSIONS)
+
+# Characters that end a value; anything else directly after one (e.g. the
+# ".5" of a number split across chunks) means the value may be incomplete
+_DELIMITERS = _WHITESPACE + ",]"
+
+def iter_json_array(path, chunk_size=1 << 20):
+    """
+    Yield the elements of a top-level JSON array one at a time.
+    Reads chunk_size characters at a time, so memory stays bounded by the
+    chunk plus the largest single article instead of the whole file.
+    Raises json.JSONDecodeError on malformed input, including missing
+    commas and anything but whitespace after the closing bracket.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        eof = False
+        # "start" (before "["), "first" (after "["), "value" (after ","),
+        # "separator" (after a value), "done" (after "]")
+        state = "start"
+
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos >= len(buf):
+                if eof:
+                    break
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+
+            ch = buf[pos]
+            if state == "done":
+                raise json.JSONDecodeError("Extra data after end of dataset", buf, pos)
+            if state == "start":
+                if ch != "[":
+                    raise json.JSONDecodeError("Expecting '[' at start of dataset", buf, pos)
+                state = "first"
+                pos += 1
+                continue
+            if state == "separator":
+                if ch == ",":
+                    state = "value"
+                elif ch == "]":
+                    state = "done"
+                else:
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+                pos += 1
+                continue
+            if state == "first" and ch == "]":
+                state = "done"
+                pos += 1
+                continue
+
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                item, end = None, None
+            # An element that reaches the end of the buffer, or is followed by
+            # a token running to the end of it, may be truncated
+            if not eof and (
+                end is None or end >= len(buf)
+                or (buf[end] not in _DELIMITERS and not any(c in _DELIMITERS for c in buf[end:]))
+            ):
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+            yield item
+            pos = end
+            state = "separator"
+
+    if state != "done":
+        if state == "start":
+            raise json.JSONDecodeError("Unexpected end of dataset", buf, pos)
+        raise json.JSONDecodeError("Expecting ']' at end of dataset", buf, pos)
+
+def iter_ndjson(path):
+    """Yield one article per non-blank line of a newline-delimited JSON file."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def _ndjson_ranges(path, chunk_bytes):
+    """Split a file into (start, end) byte ranges that end on line boundaries."""
+    size = os.path.getsize(path)
+    ranges = []
+    with open(path, "rb") as f:
+        start = 0
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+def _parse_ndjson_range(path, start, end):
+    with open(path, "rb") as f:
+        f.seek(start)
+        block = f.read(end - start)
+    return [json.loads(line) for line in block.splitlines() if line.strip()]
+
+def iter_ndjson_parallel(path, workers, chunk_bytes=16 << 20):
+    """
+    Parse a newline-delimited JSON file in byte-range chunks on a process
+    pool and yield articles in file order. At most 2 * workers chunks are
+    in flight, which bounds peak memory.
+    """
+    ranges = _ndjson_ranges(path, chunk_bytes)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        next_range = 0
+        while pending or next_range < len(ranges):
+            while next_range < len(ranges) and len(pending) < 2 * workers:
+                start, end = ranges[next_range]
+                pending.append(pool.submit(_parse_ndjson_range, path, start, end))
+                next_range += 1
+            for article in pending.pop(0).result():
+                yield article
+
+def iter_articles(path, workers=1):
+    """Stream raw articles from a JSON array or newline-delimited JSON dataset."""
+    if is_ndjson(path):
+        if workers > 1:
+            return iter_ndjson_parallel(path, workers)
+        return iter_ndjson(path)
+    return iter_json_array(path)
@@ -0,0 +1,209 @@
+import heapq
+import math
+import re
+from array import array
+from bisect import bisect_left
+
+from utils.wikipedia_index import normalize_title
+from utils.wikipedia_store import ID_TYPECODE
+
+# Substring queries are answered from n-gram postings up to this length
+MAX_GRAM = 3
+
+# BM25 parameters (standard defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that "
+    "the this to was were which with".split()
+)
+
+def tokenize(text):
+    """Lowercase word tokens without stopwords."""
+    if not isinstance(text, str):
+        return []
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+class TitleSearchIndex:
+    """
+    Precomputed title search structures, keyed by article id:
+    - 1..MAX_GRAM-gram postings (sorted article ids) for substring queries
+    - article ids sorted by normalized title for prefix/autocomplete queries
+    Display titles are the store's own string objects and previews are the
+    dataset's shared "previews" index, so only the normalized titles are
+    extra copies.
+    """
+
+    def __init__(self, data, previews):
+        self.titles = [None] * len(data)      # display title per article id
+        self.normalized = [None] * len(data)  # normalized title per article id
+        self.previews = previews
+        self.grams = {}
+        for article_id, title, _summary, _article in searchable_articles(data):
+            normalized = normalize_title(title)
+            if normalized == title:
+                normalized = title  # already lowercase: share the string
+            self.titles[article_id] = title
+            self.normalized[article_id] = normalized
+            for gram in _grams(normalized):
+                self.grams.setdefault(gram, []).append(article_id)
+        normalized = self.normalized
+        self.sorted_ids = array(ID_TYPECODE, sorted(
+            (i for i, n in enumerate(normalized) if n is not None), key=normalized.__getitem__
+        ))
+
+    def _candidates(self, query):
+        """Article ids that contain every n-gram of the query (smallest postings first)."""
+        if len(query) <= MAX_GRAM:
+            return self.grams.get(query, [])
+        postings = []
+        for start in range(len(query) - MAX_GRAM + 1):
+            plist = self.grams.get(query[start:start + MAX_GRAM])
+            if not plist:
+                return []
+            postings.append(plist)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for plist in postings[1:]:
+            candidates.intersection_update(plist)
+            if not candidates:
+                break
+        return candidates
+
+    def substring_matches(self, query):
+        """Ids of articles whose normalized title contains query."""
+        if not query:
+            return []
+        if len(query) <= MAX_GRAM:
+            return list(self._candidates(query))
+        normalized = self.normalized
+        return [i for i in self._candidates(query) if query in normalized[i]]
+
+    def prefix_matches(self, query):
+        """Ids of articles whose normalized title starts with query."""
+        sorted_ids = self.sorted_ids
+        normalized = self.normalized
+        matches = []
+        pos = bisect_left(sorted_ids, query, key=normalized.__getitem__)
+        while pos < len(sorted_ids) and normalized[sorted_ids[pos]].startswith(query):
+            matches.append(sorted_ids[pos])
+            pos += 1
+        return matches
+
+    def top_k(self, ids, query, limit, offset=0):
+        """Rank ids (exact matches first, then by title) and return one page."""
+        titles = self.titles
+        normalized = self.normalized
+        ranked = heapq.nsmallest(
+            offset + limit, ids,
+            key=lambda i: (normalized[i] != query, titles[i]),
+        )
+        return [
+            {"title": titles[i], "summary": self.previews[i]}
+            for i in ranked[offset:]
+        ]
+
+class TextSearchIndex:
+    """
+    Inverted index over article summaries (and categories) for BM25 ranking,
+    keyed by article id like the TitleSearchIndex.
+    Each term keeps parallel postings lists of article ids and per-field term
+    frequencies, so queries only touch documents containing a query term.
+    """
+
+    def __init__(self, data):
+        self.postings = {}    # term -> (article ids, summary tfs, category tfs)
+        # Lengths per article id; articles that aren't searchable stay at 0
+        summary_lengths = [0] * len(data)
+        category_lengths = [0] * len(data)
+        doc_count = 0
+        for article_id, _title, summary, article in searchable_articles(data):
+            doc_count += 1
+            summary_tokens = tokenize(summary)
+            categories = article.get("categories", [])
+            category_tokens = []
+            if isinstance(categories, list):
+                for category in categories:
+                    category_tokens.extend(tokenize(category))
+            summary_lengths[article_id] = len(summary_tokens)
+            category_lengths[article_id] = len(category_tokens)
+
+            counts = {}
+            for token in summary_tokens:
+                counts[token] = counts.get(token, 0) + 1
+            category_counts = {}
+            for token in category_tokens:
+                category_counts[token] = category_counts.get(token, 0) + 1
+            for token in counts.keys() | category_counts.keys():
+                docs, summary_tfs, category_tfs = self.postings.setdefault(token, ([], [], []))
+                docs.append(article_id)
+                summary_tfs.append(counts.get(token, 0))
+                category_tfs.append(category_counts.get(token, 0))
+
+        self.doc_count = doc_count
+        self.summary_lengths = summary_lengths
+        self.all_lengths = [s + c for s, c in zip(summary_lengths, category_lengths)]
+        self.avg_summary_length = sum(summary_lengths) / doc_count if doc_count else 0.0
+        self.avg_all_length = sum(self.all_lengths) / doc_count if doc_count else 0.0
+
+        # Precomputed idf per term: summary-only and summary+categories
+        self.idf_summary = {}
+        self.idf_all = {}
+        for term, (docs, summary_tfs, _category_tfs) in self.postings.items():
+            df_summary = sum(1 for tf in summary_tfs if tf)
+            if df_summary:
+                self.idf_summary[term] = _idf(self.doc_count, df_summary)
+            self.idf_all[term] = _idf(self.doc_count, len(docs))
+
+    def search(self, query, limit, offset=0, include_categories=False):
+        """Return (match count, [(article id, score)]) for one page of BM25 results."""
+        if include_categories:
+            idf, lengths, avg_length = self.idf_all, self.all_lengths, self.avg_all_length
+        else:
+            idf, lengths, avg_length = self.idf_summary, self.summary_lengths, self.avg_summary_length
+        avg_length = avg_length or 1.0
+
+        scores = {}
+        for term in set(tokenize(query)):
+            term_idf = idf.get(term)
+            if term_idf is None:
+                continue
+            docs, summary_tfs, category_tfs = self.postings[term]
+            for pos, article_id in enumerate(docs):
+                tf = summary_tfs[pos]
+                if include_categories:
+                    tf += category_tfs[pos]
+                if not tf:
+                    continue
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[article_id] / avg_length)
+                scores[article_id] = scores.get(article_id, 0.0) + term_idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        ranked = heapq.nlargest(offset + limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return len(scores), ranked[offset:]
+
+def searchable_articles(data):
+    """Yield (article id, title, summary, article) for articles with string title and summary."""
+    for article_id, article in enumerate(data):
+        title = article.get("title", "")
+        summary = article.get("summary", "")
+        if isinstance(title, str) and isinstance(summary, str):
+            yield article_id, title, summary, article
+
+def _idf(doc_count, df):
+    return math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+
+def _grams(text):
+    """All distinct substrings of text with length 1..MAX_GRAM."""
+    grams = set()
+    for size in range(1, MAX_GRAM + 1):
+        for start in range(len(text) - size + 1):
+            grams.add(text[start:start + size])
+    return grams
+
+def build_title_search_index(data, previews):
+    return TitleSearchIndex(data, previews)
+
+def build_text_search_index(data):
+    return TextSearchIndex(data)
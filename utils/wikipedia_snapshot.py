@@ -0,0 +1,114 @@
+"""
+Versioned binary snapshot of the Wikipedia store and its indexes.
+
+Layout: a fixed header (magic, format version, sha256/size/mtime of the
+source dataset, HMAC-SHA256 tag) followed by a pickle of (store, indexes).
+Loading still unpickles every object onto the heap, so it costs seconds
+for large datasets; what it skips is JSON parsing and index building.
+
+The payload is only unpickled after its tag checks out against
+WIKIPEDIA_SNAPSHOT_KEY, so write access to the data directory alone can't
+be turned into code execution. Without a key no snapshot is read or
+written.
+
+Build ahead of deploy with:
+    WIKIPEDIA_SNAPSHOT_KEY=... python -m utils.wikipedia_snapshot
+"""
+import gc
+import hashlib
+import hmac
+import os
+import pickle
+import struct
+
+MAGIC = b"WIKISNAP"
+# Bump whenever the store or index classes change shape
+FORMAT_VERSION = 3
+_HEADER = struct.Struct("<8sI32sQq32s")
+_TAG_OFFSET = _HEADER.size - 32
+
+def source_hash(path, chunk_size=1 << 20):
+    """sha256 digest of the source dataset file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+def _tag(key, fields, payload):
+    """HMAC-SHA256 over the header fields (everything before the tag) and the payload."""
+    mac = hmac.new(key, fields, hashlib.sha256)
+    mac.update(payload)
+    return mac.digest()
+
+def write_snapshot(snapshot_path, source_path, store, indexes, key, digest=None):
+    """Write store + indexes for source_path (atomically replaces any old snapshot)."""
+    stat = os.stat(source_path)
+    if digest is None:
+        digest = source_hash(source_path)
+    payload = pickle.dumps((store, indexes), protocol=pickle.HIGHEST_PROTOCOL)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, digest, stat.st_size, stat.st_mtime_ns, b"")
+    fields = header[:_TAG_OFFSET]
+    tmp_path = f"{snapshot_path}.tmp{os.getpid()}"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(fields)
+            f.write(_tag(key, fields, payload))
+            f.write(payload)
+        os.replace(tmp_path, snapshot_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def load_snapshot(snapshot_path, source_path, key):
+    """
+    Return (store, indexes, source sha256) if snapshot_path matches the
+    current source file and carries a valid tag for key, otherwise None.
+    Size and mtime are checked first; the source is only rehashed when they
+    differ from the ones recorded at build time.
+    """
+    if not os.path.exists(snapshot_path):
+        return None
+    try:
+        stat = os.stat(source_path)
+        with open(snapshot_path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return None
+            magic, version, digest, size, mtime_ns, tag = _HEADER.unpack(header)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                return None
+            if (size, mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+                if source_hash(source_path) != digest:
+                    return None
+            # Verify and unpickle the same bytes, so the file can't change in between
+            payload = f.read()
+        if not hmac.compare_digest(tag, _tag(key, header[:_TAG_OFFSET], payload)):
+            print(f"[WARN] Ignoring snapshot {snapshot_path}: authentication failed")
+            return None
+        # The payload is one large object graph: skip cyclic GC passes while it's rebuilt
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            store, indexes = pickle.loads(payload)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return store, indexes, digest
+    except (OSError, ValueError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+        print(f"[WARN] Ignoring unreadable snapshot {snapshot_path}: {e}")
+        return None
+
+def main():
+    from config import DATA_PATH, SNAPSHOT_KEY, SNAPSHOT_PATH
+    from utils.wikipedia_loader import build_dataset
+
+    if not SNAPSHOT_KEY:
+        raise SystemExit("Set WIKIPEDIA_SNAPSHOT_KEY to sign the snapshot")
+    digest = source_hash(DATA_PATH)
+    store, indexes = build_dataset(DATA_PATH)
+    write_snapshot(SNAPSHOT_PATH, DATA_PATH, store, indexes, SNAPSHOT_KEY, digest)
+    print(f"Wrote snapshot of {len(store)} articles to {SNAPSHOT_PATH}")
+
+if __name__ == "__main__":
+    main()
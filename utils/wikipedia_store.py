@@ -0,0 +1,155 @@
+import sys
+from array import array
+
+# Typecode for string ids (4-byte unsigned on all supported platforms)
+ID_TYPECODE = "I"
+
+class Article:
+    """
+    Compact article record with a dict-style read API (get / [] / in).
+    Categories and links are stored as integer ids into the store's shared,
+    interned string table; titles are interned so they share storage with
+    the link strings that point at them. Values that don't fit the expected
+    shape (non-string titles, non-list fields, unknown keys) are kept as-is
+    in `extra`, so `get` returns exactly what the raw JSON held.
+    """
+
+    __slots__ = ("title", "summary", "categories", "links", "images", "extra", "_strings")
+
+    def __init__(self, title, summary, categories, links, images, extra, strings):
+        self.title = title
+        self.summary = summary
+        self.categories = categories
+        self.links = links
+        self.images = images
+        self.extra = extra
+        self._strings = strings
+
+    def __reduce__(self):
+        # Positional args pickle far more compactly than per-slot state
+        return (Article, (self.title, self.summary, self.categories, self.links,
+                          self.images, self.extra, self._strings))
+
+    def get(self, key, default=None):
+        if key == "title" and self.title is not None:
+            return self.title
+        if key == "summary" and self.summary is not None:
+            return self.summary
+        if key == "categories" and self.categories is not None:
+            strings = self._strings
+            return [strings[i] for i in self.categories]
+        if key == "links" and self.links is not None:
+            strings = self._strings
+            return [strings[i] for i in self.links]
+        if key == "images" and self.images is not None:
+            return list(self.images)
+        if self.extra is not None:
+            return self.extra.get(key, default)
+        return default
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def to_dict(self):
+        """Rebuild the original JSON object."""
+        result = {}
+        for key in ("title", "summary", "categories", "images", "links"):
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                result[key] = value
+        if self.extra:
+            result.update(self.extra)
+        return result
+
+_MISSING = object()
+
+class ArticleStore:
+    """Read-only sequence of Article records sharing one string table."""
+
+    def __init__(self, records, strings):
+        self.records = records
+        self.strings = strings
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __bool__(self):
+        return bool(self.records)
+
+class ArticleStoreBuilder:
+    """Builds an ArticleStore one raw JSON article at a time."""
+
+    def __init__(self):
+        self.records = []
+        self.strings = []
+        self._string_ids = {}
+
+    def _string_id(self, value):
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = len(self.strings)
+            value = sys.intern(value)
+            self.strings.append(value)
+            self._string_ids[value] = string_id
+        return string_id
+
+    def _encode(self, values):
+        """Encode a list of strings as an id array, or None if it isn't one."""
+        if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+            return None
+        return array(ID_TYPECODE, [self._string_id(v) for v in values])
+
+    def add(self, raw):
+        """Append one article (a dict from the JSON dataset)."""
+        if not isinstance(raw, dict):
+            raw = {}
+        extra = {}
+        title = raw.get("title")
+        if isinstance(title, str):
+            title = sys.intern(title)
+        else:
+            title = None
+        summary = raw.get("summary")
+        if not isinstance(summary, str):
+            summary = None
+        categories = self._encode(raw.get("categories"))
+        links = self._encode(raw.get("links"))
+        images = raw.get("images")
+        if isinstance(images, list) and all(isinstance(v, str) for v in images):
+            images = tuple(images)
+        else:
+            images = None
+
+        stored = {"title": title, "summary": summary, "categories": categories,
+                  "links": links, "images": images}
+        for key, value in raw.items():
+            if stored.get(key) is None:
+                extra[key] = value
+
+        self.records.append(Article(
+            title, summary, categories, links, images, extra or None, self.strings
+        ))
+
+    def finish(self):
+        """Return the finished store; the builder's lookup table is released."""
+        self._string_ids = None
+        return ArticleStore(self.records, self.strings)
+
+def build_store(data):
+    """Build a compact ArticleStore from a list of raw JSON articles."""
+    builder = ArticleStoreBuilder()
+    for raw in data:
+        builder.add(raw)
+    return builder.finish()
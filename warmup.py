@@ -1,11 +1,42 @@
 # warmup.py
-import requests
+"""
+Warm up a deployment, or load-test it.
 
-BASE_URL = "https://tds-project2-wikipedia-api.up.railway.app"
+Without --duration this sends one request per endpoint, in order, and
+prints each status and latency (the original warm-up pass). With
+--duration it then keeps --concurrency requests in flight for that many
+seconds, cycling through the endpoints and the CSV uploads, and reports
+throughput and p50/p95/p99 latency per endpoint.
+
+    python warmup.py                                   # warm the Railway app
+    python warmup.py --base-url http://127.0.0.1:8000 --duration 30 --concurrency 16
+    python warmup.py --local --duration 20 --only analyze --no-cache --json run.json
+
+--local starts `uvicorn main:app` on a free port (as the Procfile does) and
+stops it afterwards. Uploads are byte-identical by default and so are
+answered from the result cache after the first one; --no-cache makes every
+upload unique.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from itertools import count
+
+import httpx
+
+BASE_URL = os.environ.get("WARMUP_BASE_URL", "https://tds-project2-wikipedia-api.up.railway.app")
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 ENDPOINTS = [
-    "/", 
-    "/search?q=Python", 
+    "/",
+    "/search?q=Python",
     "/summary?title=Python%20(programming%20language)",
     "/links?title=Python%20(programming%20language)",
     "/images?title=Python%20(programming%20language)",
@@ -16,9 +47,217 @@ ENDPOINTS = [
     "/top_categories?limit=5"
 ]
 
-for ep in ENDPOINTS:
+# CSV uploads POSTed to / (the filename picks the analyzer)
+UPLOADS = [
+    os.path.join(PROJECT_DIR, "sample-weather.csv"),
+    os.path.join(PROJECT_DIR, "sample-sales.csv"),
+    os.path.join(PROJECT_DIR, "sample-network.csv"),
+]
+
+PERCENTILES = (50, 95, 99)
+
+# --no-cache tags each upload with this many bits, as a fixed-size run of
+# blank lines, so every upload has the same size however long the run is
+UNIQUE_BITS = 40
+
+def unique_suffix(value: int) -> bytes:
+    """2 * UNIQUE_BITS bytes of blank lines encoding value ("\r\n" = 1, "\n\n" = 0)."""
+    return b"".join(b"\r\n" if value >> bit & 1 else b"\n\n" for bit in range(UNIQUE_BITS))
+
+class Target:
+    """One request template: a GET endpoint or a CSV upload."""
+
+    def __init__(self, path: str, upload: str = None):
+        self.path = path
+        self.upload = upload
+        self.name = f"POST / {os.path.basename(upload)}" if upload else f"GET {path}"
+        if upload:
+            with open(upload, "rb") as f:
+                self.body = f.read()
+
+    async def send(self, client: httpx.AsyncClient, unique: int = None) -> httpx.Response:
+        if not self.upload:
+            return await client.get(self.path)
+        body = self.body
+        if unique is not None:
+            # Trailing blank lines are skipped by the CSV parser but change the
+            # upload hash, so the result cache can't answer
+            body = body.rstrip(b"\n") + b"\n" + unique_suffix(unique)
+        files = {"file": (os.path.basename(self.upload), body, "text/csv")}
+        return await client.post(self.path, files=files)
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+class Stats:
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.statuses = {}
+
+    def record(self, seconds: float, status) -> None:
+        self.latencies.append(seconds)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if not isinstance(status, int) or status >= 400:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> dict:
+        values = sorted(self.latencies)
+        result = {
+            "requests": len(values),
+            "errors": self.errors,
+            "rps": round(len(values) / elapsed, 2) if elapsed else None,
+            "mean_ms": round(sum(values) / len(values) * 1000, 1) if values else None,
+            "max_ms": round(values[-1] * 1000, 1) if values else None,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items(), key=lambda item: str(item[0]))},
+        }
+        for p in PERCENTILES:
+            result[f"p{p}_ms"] = round(percentile(values, p) * 1000, 1) if values else None
+        return result
+
+async def _timed_send(target: Target, client, unique=None):
+    start = time.perf_counter()
     try:
-        r = requests.get(BASE_URL + ep, timeout=10)
-        print(f"[{r.status_code}] {ep} -> {r.elapsed.total_seconds():.2f}s")
-    except Exception as e:
-        print(f"[ERROR] {ep} -> {e}")
+        response = await target.send(client, unique)
+        status = response.status_code
+    except httpx.HTTPError as exc:
+        status = type(exc).__name__
+    return time.perf_counter() - start, status
+
+async def warm(client, targets) -> None:
+    for target in targets:
+        seconds, status = await _timed_send(target, client)
+        label = f"[{status}]" if isinstance(status, int) else "[ERROR]"
+        print(f"{label} {target.name} -> {seconds:.2f}s")
+
+async def load(client, targets, concurrency: int, duration: float, unique_uploads: bool) -> dict:
+    """Closed-loop load: concurrency workers each send back-to-back requests until duration."""
+    stats = {target.name: Stats() for target in targets}
+    sequence = count()
+    # Per-run salt, so uploads don't repeat those of an earlier run either
+    salt = random.getrandbits(UNIQUE_BITS)
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            n = next(sequence)
+            target = targets[n % len(targets)]
+            unique = (salt + n) % (1 << UNIQUE_BITS) if unique_uploads and target.upload else None
+            seconds, status = await _timed_send(target, client, unique)
+            stats[target.name].record(seconds, status)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    total = Stats()
+    for s in stats.values():
+        total.latencies.extend(s.latencies)
+        total.errors += s.errors
+        for status, n in s.statuses.items():
+            total.statuses[status] = total.statuses.get(status, 0) + n
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "concurrency": concurrency,
+        "endpoints": {name: s.summary(elapsed) for name, s in stats.items()},
+        "total": total.summary(elapsed),
+    }
+
+def print_report(report: dict) -> None:
+    print(f"\n{report['total']['requests']} requests in {report['elapsed_s']}s "
+          f"at concurrency {report['concurrency']}: {report['total']['rps']} req/s, "
+          f"{report['total']['errors']} errors")
+    header = f"{'endpoint':<58} {'reqs':>6} {'err':>5} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    for name, s in rows:
+        ms = [f"{s[f'p{p}_ms']:.1f}" if s[f"p{p}_ms"] is not None else "-" for p in PERCENTILES]
+        print(f"{name[:58]:<58} {s['requests']:>6} {s['errors']:>5} {s['rps'] or 0:>8} "
+              f"{ms[0]:>8} {ms[1]:>8} {ms[2]:>8}")
+    print("(latencies in ms)")
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@contextmanager
+def local_server(timeout: float = 60.0):
+    """Run `uvicorn main:app` from the project directory; yields its base URL."""
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=PROJECT_DIR,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        start = time.perf_counter()
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"local server exited with code {proc.returncode}")
+            try:
+                if httpx.get(base_url + "/", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.perf_counter() - start > timeout:
+                raise TimeoutError(f"local server not ready after {timeout}s")
+            time.sleep(0.05)
+        print(f"Local server ready at {base_url} in {time.perf_counter() - start:.2f}s")
+        yield base_url
+    finally:
+        proc.terminate()
+        proc.wait()
+
+def build_targets(only: str, uploads: list) -> list:
+    targets = []
+    if only in ("all", "wikipedia"):
+        targets += [Target(path) for path in ENDPOINTS]
+    if only in ("all", "analyze"):
+        targets += [Target("/", upload) for upload in uploads]
+    return targets
+
+async def run(base_url: str, args) -> dict:
+    targets = build_targets(args.only, args.upload or UPLOADS)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        await warm(client, targets)
+        if args.duration <= 0:
+            return None
+        report = await load(client, targets, args.concurrency, args.duration, args.no_cache)
+    report["base_url"] = base_url
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default=BASE_URL, help="server to target (default: %(default)s)")
+    parser.add_argument("--local", action="store_true", help="start main:app locally and target it")
+    parser.add_argument("--duration", type=float, default=0, help="seconds of load after the warm-up pass")
+    parser.add_argument("--concurrency", type=int, default=8, help="requests kept in flight")
+    parser.add_argument("--only", choices=("all", "wikipedia", "analyze"), default="all")
+    parser.add_argument("--upload", action="append", help="CSV to upload (repeatable; default: the sample CSVs)")
+    parser.add_argument("--no-cache", action="store_true", help="make every upload unique")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--json", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    if args.local:
+        with local_server() as base_url:
+            report = asyncio.run(run(base_url, args))
+    else:
+        report = asyncio.run(run(args.base_url.rstrip("/"), args))
+    if report is None:
+        return
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()